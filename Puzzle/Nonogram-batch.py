@@ -0,0 +1,65 @@
+import argparse
+import csv
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from nonogram_io import read_non
+from nonogram_search import ENGINES
+
+
+"""
+Resuelve todos los .non de un directorio en un pool de procesos y escribe una fila de CSV por
+puzzle (tiempo, nodos, backtracks y estado). Los puzzles se reparten en bloques de chunksize
+para que miles de puzzles chicos no paguen un viaje al pool cada uno, y las filas se escriben
+a medida que llegan.
+"""
+
+FIELDS = ['puzzle', 'width', 'height', 'engine', 'status', 'time', 'nodes', 'backtracks']
+
+
+def solve_file(file_path, engine, node_limit, time_limit):
+    try:
+        row_clues, col_clues, _ = read_non(file_path)
+    except (OSError, ValueError) as error:
+        return {'puzzle': file_path, 'engine': engine, 'status': f"error: {error}"}
+
+    start_time = time.perf_counter()
+    status, _, node_count, backtrack_count = ENGINES[engine](row_clues, col_clues, node_limit, time_limit)
+    elapsed_time = time.perf_counter() - start_time
+    return {'puzzle': file_path, 'width': len(col_clues), 'height': len(row_clues), 'engine': engine,
+            'status': status, 'time': f"{elapsed_time:.6f}", 'nodes': node_count, 'backtracks': backtrack_count}
+
+
+def solve_batch(paths, output, engine='improved', workers=None, node_limit=None, time_limit=None, chunksize=16):
+    counts = {}
+    with open(output, 'w', newline='') as file, ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        results = pool.map(solve_file, paths, [engine] * len(paths), [node_limit] * len(paths), [time_limit] * len(paths), chunksize=chunksize)
+        for row in results:
+            writer.writerow(row)
+            counts[row['status']] = counts.get(row['status'], 0) + 1
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolver en paralelo todos los nonogramas .non de un directorio.")
+    parser.add_argument("directory", type=str, help="Directorio con archivos .non (se recorre recursivamente)")
+    parser.add_argument("--output", type=str, default="results.csv", help="Archivo CSV de salida")
+    parser.add_argument("--engine", type=str, default="improved", choices=sorted(ENGINES), help="Motor de busqueda")
+    parser.add_argument("--workers", type=int, default=None, help="Cantidad de procesos del pool")
+    parser.add_argument("--node-limit", type=int, default=None, help="Maximo de nodos por puzzle")
+    parser.add_argument("--time-limit", type=float, default=None, help="Tiempo maximo por puzzle en segundos")
+    parser.add_argument("--chunksize", type=int, default=16, help="Puzzles por envio al pool")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.directory, "**", "*.non"), recursive=True))
+    start_time = time.perf_counter()
+    counts = solve_batch(paths, args.output, args.engine, args.workers, args.node_limit, args.time_limit, args.chunksize)
+    elapsed_time = time.perf_counter() - start_time
+
+    print(f"Puzzles: {len(paths)} en {elapsed_time:.2f} segundos -> {args.output}")
+    for status, count in sorted(counts.items()):
+        print(f"  {status}: {count}")
@@ -0,0 +1,149 @@
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import resource
+import time
+
+from nonogram_io import read_non
+from nonogram_search import ENGINES
+
+
+"""
+Benchmark de los motores de nonogramas sobre el corpus fijo de puzzles/ (de 5x5 a 50x50; los
+"easy" se resuelven solo con propagacion y los "hard" necesitan backtracking).
+
+Cada par (motor, puzzle) corre en su propio proceso y se termina si pasa el timeout. La memoria
+es el maximo de memoria residente de ese proceso (ru_maxrss): como el proceso es nuevo, mide el
+pico de la corrida y no lo que ya habia usado otra (tracemalloc haria mas lento al motor varias
+veces y cambiaria los tiempos). Las corridas cortas se repiten
+y se guarda el menor tiempo, para que el ruido no parezca una regresion.
+
+El resultado se compara con un baseline guardado en JSON: es regresion si un puzzle que se
+resolvia ya no se resuelve, si sube la cantidad de nodos o si el tiempo sube mas que la
+tolerancia (ignorando tiempos menores que min_time).
+"""
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "puzzles")
+DEFAULT_BASELINE = os.path.join(DEFAULT_CORPUS, "baseline.json")
+
+
+def _measure(engine, file_path, connection):
+    row_clues, col_clues, _ = read_non(file_path)
+    start_time = time.perf_counter()
+    status, _, node_count, backtrack_count = ENGINES[engine](row_clues, col_clues)
+    elapsed_time = time.perf_counter() - start_time
+    # Maximo absoluto de memoria residente del proceso hijo (en KB en Linux); incluye el interprete y
+    # los modulos ya cargados, unos MB iguales para todos los motores
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    connection.send({'status': status, 'time': elapsed_time, 'nodes': node_count,
+                     'backtracks': backtrack_count, 'peak_kb': peak})
+
+
+def run_one(engine, file_path, timeout):
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_measure, args=(engine, file_path, sender))
+    process.start()
+    sender.close()
+    # Esperar el resultado por el pipe (un resultado grande no debe bloquear al hijo antes del join)
+    if receiver.poll(timeout):
+        try:
+            result = receiver.recv()
+        except EOFError:
+            result = {'status': 'error'}
+    else:
+        process.terminate()
+        result = {'status': 'timeout', 'time': timeout}
+    process.join()
+    receiver.close()
+    if result['status'] == 'error' or process.exitcode not in (0, -15):
+        result = {'status': 'error'}
+    return result
+
+
+def run_benchmark(engines, paths, timeout, repeat=3, repeat_below=1.0):
+    results = {}
+    for file_path in paths:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        for engine in engines:
+            result = run_one(engine, file_path, timeout)
+            for _ in range(repeat - 1):
+                if result['status'] != 'solved' or result['time'] > repeat_below:
+                    break
+                again = run_one(engine, file_path, timeout)
+                if again['status'] == 'solved' and again['time'] < result['time']:
+                    result = again
+            results[f"{engine}/{name}"] = result
+            line = f"{engine:>10} {name:<14} {result['status']:<8}"
+            if 'nodes' in result:
+                line += f" {result['time']:9.4f} s {result['nodes']:>9} nodos {result['backtracks']:>9} backtracks {result['peak_kb']:>9.0f} KB"
+            print(line, flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance=0.5, min_time=0.05):
+    regressions = []
+    improvements = []
+    for key, result in sorted(results.items()):
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        if previous['status'] == 'solved' and result['status'] != 'solved':
+            regressions.append(f"{key}: {previous['status']} -> {result['status']}")
+            continue
+        if result['status'] == 'solved' and previous['status'] != 'solved':
+            improvements.append(f"{key}: {previous['status']} -> {result['status']}")
+            continue
+        if result['status'] != 'solved':
+            continue
+        if result['nodes'] > previous['nodes']:
+            regressions.append(f"{key}: nodos {previous['nodes']} -> {result['nodes']}")
+        elif result['nodes'] < previous['nodes']:
+            improvements.append(f"{key}: nodos {previous['nodes']} -> {result['nodes']}")
+        if max(result['time'], previous['time']) >= min_time:
+            ratio = result['time'] / previous['time'] if previous['time'] > 0 else float('inf')
+            if ratio > 1 + tolerance:
+                regressions.append(f"{key}: tiempo {previous['time']:.4f} -> {result['time']:.4f} s (x{ratio:.2f})")
+            elif ratio < 1 / (1 + tolerance):
+                improvements.append(f"{key}: tiempo {previous['time']:.4f} -> {result['time']:.4f} s (x{ratio:.2f})")
+    return regressions, improvements
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de los motores de nonogramas con reporte de regresiones.")
+    parser.add_argument("--corpus", type=str, default=DEFAULT_CORPUS, help="Directorio con los .non del benchmark")
+    parser.add_argument("--engines", type=str, nargs="+", default=sorted(ENGINES), choices=sorted(ENGINES), help="Motores a comparar")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Tiempo maximo por puzzle y motor en segundos")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones de las corridas de menos de un segundo (se guarda la mas rapida)")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE, help="JSON con los resultados de referencia")
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar los resultados como nuevo baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Aumento relativo de tiempo que cuenta como regresion")
+    parser.add_argument("--min-time", type=float, default=0.05, help="No comparar tiempos cuando ambos son menores que esto")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.corpus, "*.non")))
+    results = run_benchmark(args.engines, paths, args.timeout, args.repeat)
+
+    if args.save_baseline:
+        # Se actualizan solo los motores que se corrieron; los demas quedan como estaban
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r') as file:
+                baseline = json.load(file)
+        baseline.update(results)
+        with open(args.baseline, 'w') as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+        print(f"Baseline guardado en {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)
+        regressions, improvements = compare(results, baseline, args.tolerance, args.min_time)
+        print(f"\nMejoras respecto al baseline: {len(improvements)}")
+        for line in improvements:
+            print(f"  {line}")
+        print(f"Regresiones respecto al baseline: {len(regressions)}")
+        for line in regressions:
+            print(f"  {line}")
+        if regressions:
+            raise SystemExit(1)
@@ -0,0 +1,191 @@
+import argparse
+import multiprocessing
+import queue
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from nonogram_io import read_non
+from nonogram_search import ENGINES, NonogramSearch
+
+
+"""
+Dos modos paralelos para nonogramas dificiles.
+
+split: el arbol de busqueda se parte en subproblemas independientes. Un trabajo es una lista de
+celdas asumidas mas un camino de decisiones (NonogramSearch.open_path) del que se sigue la
+busqueda; cada proceso del pool corre un trabajo por a lo sumo slice_time segundos y, si no
+termina, devuelve su camino. Cuando hay procesos sin trabajo se le saca a un camino devuelto su
+alternativa abierta mas alta (el subarbol mas grande que le queda) como trabajo nuevo, asi que
+los procesos libres le roban trabajo a los que tienen mas. Al principio el camino se parte en las
+primeras split_depth decisiones.
+
+portfolio: cada motor de ENGINES (u otra lista) corre en su propio proceso sobre el puzzle
+completo; el primero que termina gana y los demas se terminan. Si todos los procesos terminan
+sin entregar un resultado (p. ej. muertos por falta de memoria) el estado es 'error', y si
+siguen vivos pasado time_limit (mas un margen) es 'timeout'.
+
+Con un solo nucleo ninguno de los dos modos es mas rapido que el motor secuencial: el tiempo
+hasta la solucion baja con la cantidad de nucleos.
+"""
+
+_worker_puzzle = None
+
+
+def _init_worker(row_clues, col_clues, options):
+    global _worker_puzzle
+    _worker_puzzle = (row_clues, col_clues, options)
+
+
+def _run_job(job, slice_time):
+    row_clues, col_clues, options = _worker_puzzle
+    assumptions, path = job
+    search = NonogramSearch(row_clues, col_clues, node_limit=0, assumptions=assumptions, path=path, **options)
+    status = search.run()
+    if status == 'limit':
+        # La propagacion inicial y rehacer el camino no cuentan para la tajada de tiempo
+        search.node_limit = None
+        search.time_limit = search.elapsed + slice_time
+        status = search.run()
+    grid = search.grid() if status == 'solved' else None
+    return status, grid, search.node_count, search.backtrack_count, (assumptions, search.open_path())
+
+
+def _steal(job):
+    # Separar la alternativa abierta mas alta del camino; el resto del camino la da por cerrada
+    assumptions, path = job
+    for level, (index, value, is_open) in enumerate(path):
+        if is_open:
+            stolen = assumptions + [(cell, choice) for cell, choice, _ in path[:level]] + [(index, 1)]
+            path = path[:level] + [(index, value, False)] + path[level + 1:]
+            return (stolen, []), (assumptions, path)
+    return None, job
+
+
+def _split(jobs, count):
+    # Repartir hasta tener count trabajos, robando de a una alternativa abierta por vez
+    while len(jobs) < count:
+        for position, job in enumerate(jobs):
+            stolen, rest = _steal(job)
+            if stolen is not None:
+                jobs[position] = rest
+                jobs.append(stolen)
+                break
+        else:
+            break
+    return jobs
+
+
+def solve_split(row_clues, col_clues, workers=None, split_depth=4, slice_time=1.0, time_limit=None, propagation=True):
+    workers = workers or multiprocessing.cpu_count()
+    options = {'propagation': propagation}
+    start_time = time.perf_counter()
+
+    # Primeras decisiones en este proceso, para tener por donde partir
+    search = NonogramSearch(row_clues, col_clues, node_limit=split_depth, **options)
+    status = search.run()
+    node_count, backtrack_count = search.node_count, search.backtrack_count
+    if status != 'limit':
+        return status, search.grid() if status == 'solved' else None, node_count, backtrack_count
+    jobs = deque(_split([([], search.open_path())], workers))
+
+    status, grid = 'unsat', None
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(row_clues, col_clues, options)) as pool:
+        running = set()
+        while jobs or running:
+            while jobs and len(running) < workers:
+                running.add(pool.submit(_run_job, jobs.popleft(), slice_time))
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job_status, job_grid, nodes, backtracks, rest = future.result()
+                node_count += nodes
+                backtrack_count += backtracks
+                if job_status == 'solved':
+                    status, grid = job_status, job_grid
+                elif job_status == 'limit':
+                    jobs.append(rest)
+            if status == 'solved':
+                break
+            if time_limit is not None and time.perf_counter() - start_time > time_limit:
+                status = 'limit'
+                break
+            # Procesos libres: sacar alternativas abiertas de los caminos que volvieron
+            if jobs and len(jobs) + len(running) < workers:
+                jobs = deque(_split(list(jobs), workers - len(running)))
+        for future in running:
+            future.cancel()
+    return status, grid, node_count, backtrack_count
+
+
+_POLL_INTERVAL = 0.1
+_RACE_GRACE = 5.0
+
+
+def _race(engine, row_clues, col_clues, time_limit, results):
+    results.put((engine, ENGINES[engine](row_clues, col_clues, None, time_limit)))
+
+
+def solve_portfolio(row_clues, col_clues, engines=None, time_limit=None):
+    engines = engines or sorted(ENGINES)
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_race, args=(engine, row_clues, col_clues, time_limit, results)) for engine in engines]
+    for process in processes:
+        process.start()
+    # Los motores respetan time_limit por su cuenta; el margen cubre el arranque de los procesos
+    deadline = None if time_limit is None else time.perf_counter() + time_limit + _RACE_GRACE
+
+    # El primero que resuelve o prueba que no hay solucion gana; 'limit' no decide nada
+    winner, result = None, ('limit', None, 0, 0)
+    received = 0
+    while received < len(processes):
+        # Se mira si quedan procesos antes de esperar: lo que un proceso puso en la cola antes de
+        # terminar ya se puede leer, asi que una cola vacia con todos terminados no va a recibir mas
+        alive = any(process.is_alive() for process in processes)
+        try:
+            engine, outcome = results.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            if not alive:
+                result = ('error', None, 0, 0)
+                break
+            if deadline is not None and time.perf_counter() > deadline:
+                result = ('timeout', None, 0, 0)
+                break
+            continue
+        received += 1
+        if outcome[0] in ('solved', 'unsat'):
+            winner, result = engine, outcome
+            break
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+    return winner, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolver un nonograma dificil en paralelo.")
+    parser.add_argument("puzzle", type=str, help="Archivo .non con las pistas")
+    parser.add_argument("--mode", type=str, default="split", choices=["split", "portfolio"], help="Partir el arbol de busqueda o correr varios motores a la vez")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos del pool en modo split")
+    parser.add_argument("--split-depth", type=int, default=4, help="Decisiones iniciales en que se parte el arbol")
+    parser.add_argument("--slice-time", type=float, default=1.0, help="Segundos por trabajo antes de devolverlo para repartir")
+    parser.add_argument("--engines", type=str, nargs="+", default=None, choices=sorted(ENGINES), help="Motores del portfolio")
+    parser.add_argument("--time-limit", type=float, default=None, help="Tiempo maximo en segundos")
+    args = parser.parse_args()
+
+    row_clues, col_clues, _ = read_non(args.puzzle)
+    start_time = time.perf_counter()
+    if args.mode == 'split':
+        status, solution, node_count, backtrack_count = solve_split(row_clues, col_clues, args.workers, args.split_depth, args.slice_time, args.time_limit)
+    else:
+        winner, (status, solution, node_count, backtrack_count) = solve_portfolio(row_clues, col_clues, args.engines, args.time_limit)
+        print(f"Motor ganador: {winner}")
+    elapsed_time = time.perf_counter() - start_time
+
+    if solution:
+        for row in solution:
+            print("".join("#" if cell == 1 else "." for cell in row))
+    print(f"Estado: {status}")
+    print(f"Tiempo de ejecución: {elapsed_time:.4f} segundos")
+    print(f"Nodos generados: {node_count}")
+    print(f"Nodos con backtracking: {backtrack_count}")
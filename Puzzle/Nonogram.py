@@ -1,112 +1,69 @@
-import itertools
+import argparse
 import time
 
+from nonogram_io import read_non
+from nonogram_search import NonogramSearch
 
-def get_row_indices(index, width):
-    row = index // width
-    return [row * width + i for i in range(width)]
 
-def get_col_indices(index, height):
-    col = index % height
-    return [col + i * height for i in range(height)]
+def solve_nonogram(row_clues, col_clues, node_limit=None, time_limit=None, backjumping=False):
+    # Busqueda iterativa con pila explicita: no depende del limite de recursion para grillas grandes
+    search = NonogramSearch(row_clues, col_clues, propagation=False, node_limit=node_limit, time_limit=time_limit, backjumping=backjumping)
+    status = search.run()
 
-def check_constraint(sequence, clues):
-    count = [len(list(g)) for k, g in itertools.groupby(sequence) if k == 1]
-    return count == clues
-
-def is_consistent(assignment, index, value, row_clues, col_clues, width, height):
-    row_indices = get_row_indices(index, width)
-    col_indices = get_col_indices(index, height)
-    
-    row = [assignment.get(i, None) for i in row_indices]
-    col = [assignment.get(i, None) for i in col_indices]
-    
-    row[index % width] = value
-    col[index // width] = value
-    
-    if None not in row and not check_constraint(row, row_clues[index // width]):
-        return False
-
-    if None not in col and not check_constraint(col, col_clues[index % height]):
-        return False
-
-    return True
-
-def forward_checking(index, domains, width, height, row_clues, col_clues, node_count, backtrack_count):
-    if index == len(domains):
-        return domains, node_count, backtrack_count
-
-    node_count += 1
-
-    for value in domains[index]:
-        assignment = {i: domains[i][0] for i in range(index)}
-
-        if is_consistent(assignment, index, value, row_clues, col_clues, width, height):
-            new_domains = [domain.copy() for domain in domains]
-            new_domains[index] = [value]
-
-            for i in range(index + 1, len(domains)):
-                new_domains[i] = [v for v in domains[i] if is_consistent(assignment, i, v, row_clues, col_clues, width, height)]
-
-            if all(new_domains[i] for i in range(index + 1, len(domains))):
-                result, new_node_count, new_backtrack_count = forward_checking(index + 1, new_domains, width, height, row_clues, col_clues, node_count, backtrack_count)
-                if result:
-                    return result, new_node_count, new_backtrack_count
-        else:
-            backtrack_count += 1
-
-    return None, node_count, backtrack_count
-
-def solve_nonogram(row_clues, col_clues):
-    height = len(row_clues)
-    width = len(col_clues)
-    domains = [[0, 1] for _ in range(width * height)]
-
-    new_domains, node_count, backtrack_count = forward_checking(0, domains, width, height, row_clues, col_clues, 0, 0)
-
-    if new_domains:
-        assignment = {i: new_domains[i][0] for i in range(len(new_domains))}
-        grid = [[assignment[row * width + col] for col in range(width)] for row in range(height)]
-        return grid, node_count, backtrack_count
+    if status == 'solved':
+        return search.grid(), search.node_count, search.backtrack_count
+    elif status == 'limit':
+        print("Limite de busqueda alcanzado")
     else:
         print("No solution found")
-        return None, node_count, backtrack_count
+    return None, search.node_count, search.backtrack_count
 
-row_clues = [
-    [4],
-    [8],
-    [10],
-    [1, 1, 2, 1, 1],
-    [1, 1, 2, 1, 1],
-    [1, 6, 1],
-    [6],
-    [2, 2],
-    [4],
-    [2]
-]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolver un nonograma.")
+    parser.add_argument("puzzle", type=str, nargs="?", default=None, help="Archivo .non con las pistas (por defecto el puzzle de ejemplo)")
+    parser.add_argument("--time-limit", type=float, default=None, help="Tiempo maximo de busqueda en segundos")
+    parser.add_argument("--backjumping", action="store_true", help="Saltar al nivel del conflicto y aprender nogoods")
+    args = parser.parse_args()
 
-col_clues = [
-    [4],
-    [2],
-    [7],
-    [3, 4],
-    [7, 2],
-    [7, 2],
-    [3, 4],
-    [7],
-    [2],
-    [4]
-]
-
-start_time = time.perf_counter()
-solution, node_count, backtrack_count = solve_nonogram(row_clues, col_clues)
-end_time = time.perf_counter()
-
-if solution:
-    for row in solution:
-        print("".join("#" if cell == 1 else "." for cell in row))
-
-elapsed_time = end_time - start_time
-print(f"Tiempo de ejecución: {elapsed_time:.4f} segundos")
-print(f"Nodos generados: {node_count}")
-print(f"Nodos con backtracking: {backtrack_count}")
\ No newline at end of file
+    if args.puzzle:
+        row_clues, col_clues, _ = read_non(args.puzzle)
+    else:
+        row_clues = [
+            [4],
+            [8],
+            [10],
+            [1, 1, 2, 1, 1],
+            [1, 1, 2, 1, 1],
+            [1, 6, 1],
+            [6],
+            [2, 2],
+            [4],
+            [2]
+        ]
+
+        col_clues = [
+            [4],
+            [2],
+            [7],
+            [3, 4],
+            [7, 2],
+            [7, 2],
+            [3, 4],
+            [7],
+            [2],
+            [4]
+        ]
+
+    start_time = time.perf_counter()
+    solution, node_count, backtrack_count = solve_nonogram(row_clues, col_clues, time_limit=args.time_limit, backjumping=args.backjumping)
+    end_time = time.perf_counter()
+
+    if solution:
+        for row in solution:
+            print("".join("#" if cell == 1 else "." for cell in row))
+
+    elapsed_time = end_time - start_time
+    print(f"Tiempo de ejecución: {elapsed_time:.4f} segundos")
+    print(f"Nodos generados: {node_count}")
+    print(f"Nodos con backtracking: {backtrack_count}")
+    print(f"Nodos por segundo: {node_count / elapsed_time:.0f}")
@@ -0,0 +1,103 @@
+"""
+Lectura y escritura de nonogramas en el formato .non (el de los catalogos de puzzles):
+
+    title "Corazon"
+    width 5
+    height 4
+
+    rows
+    1,1
+    5
+    3
+    1
+
+    columns
+    2
+    3
+    3
+    3
+    2
+
+    goal "0101011111011100010000"
+
+Las pistas van una linea por fila o columna, con los bloques separados por comas; una linea
+vacia o "0" es una linea sin bloques. Las demas claves (catalogue, author, copyright, ...) se
+guardan como texto en el diccionario de metadatos.
+"""
+
+
+def _parse_clue(line):
+    blocks = [int(block) for block in line.replace(' ', ',').split(',') if block]
+    return [block for block in blocks if block > 0]
+
+
+def parse_non(text, name='<texto>'):
+    meta = {}
+    row_clues = []
+    col_clues = []
+    section = None
+    expected = {'rows': None, 'columns': None}
+
+    for number, raw in enumerate(text.splitlines(), 1):
+        line = raw.strip()
+        if section is not None:
+            clues = row_clues if section == 'rows' else col_clues
+            if expected[section] is not None and len(clues) < expected[section]:
+                # Dentro de una seccion una linea vacia cuenta como pista vacia
+                try:
+                    clues.append(_parse_clue(line))
+                except ValueError:
+                    raise ValueError(f"{name}:{number}: pista invalida {line!r}") from None
+                continue
+            section = None
+
+        if not line or line.startswith('#'):
+            continue
+        key, _, value = line.partition(' ')
+        key = key.lower()
+        value = value.strip().strip('"')
+        if key in ('width', 'height'):
+            meta[key] = int(value)
+            expected['columns' if key == 'width' else 'rows'] = int(value)
+        elif key in ('rows', 'columns'):
+            if expected[key] is None:
+                raise ValueError(f"{name}:{number}: falta width/height antes de '{key}'")
+            section = key
+        else:
+            meta[key] = value
+
+    if len(row_clues) != meta.get('height') or len(col_clues) != meta.get('width'):
+        raise ValueError(f"{name}: se esperaban {meta.get('height')} filas y {meta.get('width')} columnas, "
+                         f"hay {len(row_clues)} y {len(col_clues)}")
+    return row_clues, col_clues, meta
+
+
+def read_non(file_path):
+    with open(file_path, 'r') as file:
+        return parse_non(file.read(), file_path)
+
+
+def format_non(row_clues, col_clues, title=None, goal=None):
+    lines = []
+    if title is not None:
+        lines.append(f'title "{title}"')
+    lines += [f"width {len(col_clues)}", f"height {len(row_clues)}", "", "rows"]
+    lines += [",".join(map(str, clue)) if clue else "0" for clue in row_clues]
+    lines += ["", "columns"]
+    lines += [",".join(map(str, clue)) if clue else "0" for clue in col_clues]
+    if goal is not None:
+        lines += ["", 'goal "' + "".join(str(cell) for row in goal for cell in row) + '"']
+    return "\n".join(lines) + "\n"
+
+
+def write_non(file_path, row_clues, col_clues, title=None, goal=None):
+    with open(file_path, 'w') as file:
+        file.write(format_non(row_clues, col_clues, title, goal))
+
+
+def goal_grid(meta):
+    goal = meta.get('goal')
+    if goal is None:
+        return None
+    width = meta['width']
+    return [[int(cell) for cell in goal[row * width:(row + 1) * width]] for row in range(meta['height'])]
@@ -0,0 +1,565 @@
+from collections import OrderedDict
+from functools import lru_cache
+
+
+"""
+Modelo por lineas del nonograma.
+
+Una linea (fila o columna) de largo n se representa como un entero de n bits: el bit k
+encendido significa que la celda k esta pintada. Para cada pista se enumeran una sola vez todas
+las colocaciones validas de sus bloques, y lo que se sabe de una linea se guarda como dos
+mascaras: filled (celdas que seguro estan pintadas) y empty (celdas que seguro estan vacias).
+"""
+
+
+@lru_cache(maxsize=None)
+def line_patterns(clue, length):
+    clue = tuple(block for block in clue if block > 0)
+    if not clue:
+        return (0,)
+
+    patterns = []
+
+    def place(k, start, mask):
+        block = clue[k]
+        # Espacio minimo que necesitan los bloques que faltan despues de este
+        rest = sum(clue[k + 1:]) + len(clue) - k - 1
+        bits = (1 << block) - 1
+        for position in range(start, length - rest - block + 1):
+            placed = mask | (bits << position)
+            if k + 1 == len(clue):
+                patterns.append(placed)
+            else:
+                place(k + 1, position + block + 1, placed)
+
+    place(0, 0, 0)
+    return tuple(patterns)
+
+
+def compatible_patterns(clue, length, filled, empty):
+    # Como line_patterns pero solo las colocaciones compatibles con las mascaras filled y empty.
+    # La tabla de _leftmost descarta de antemano las posiciones que no dejan sitio a los bloques
+    # siguientes, asi que no se exploran ramas muertas
+    clue = [block for block in clue if block > 0]
+    line = cells_from_line(filled, empty, length)
+    fit, fits = _fit_table(clue, line)
+    if not fit[0][0]:
+        return []
+
+    patterns = []
+
+    def place(k, start, mask):
+        if k == len(clue):
+            patterns.append(mask)
+            return
+        block = clue[k]
+        bits = (1 << block) - 1
+        next_row = fit[k + 1]
+        for position in range(start, length - block + 1):
+            end = position + block
+            if fits(block, position) and next_row[end + 1]:
+                place(k + 1, end + 1, mask | bits << position)
+            # Un bloque no puede dejar atras una celda pintada
+            if line[position] == 1:
+                break
+
+    place(0, 0, 0)
+    return patterns
+
+
+def filter_patterns(patterns, filled, empty):
+    return [pattern for pattern in patterns if pattern & empty == 0 and pattern & filled == filled]
+
+
+def pattern_consensus(patterns, full):
+    # Celdas pintadas en todas las colocaciones y celdas vacias en todas
+    always = full
+    ever = 0
+    for pattern in patterns:
+        always &= pattern
+        ever |= pattern
+    return always, full & ~ever
+
+
+def line_from_cells(cells):
+    filled = empty = 0
+    for k, value in enumerate(cells):
+        if value == 1:
+            filled |= 1 << k
+        elif value == 0:
+            empty |= 1 << k
+    return filled, empty
+
+
+def cells_from_line(filled, empty, length):
+    return [1 if filled >> k & 1 else 0 if empty >> k & 1 else UNKNOWN for k in range(length)]
+
+
+def run_lengths(pattern):
+    counts = []
+    run = 0
+    while pattern:
+        if pattern & 1:
+            run += 1
+        elif run:
+            counts.append(run)
+            run = 0
+        pattern >>= 1
+    if run:
+        counts.append(run)
+    return counts
+
+
+"""
+Resolucion de una linea por colocacion mas a la izquierda y mas a la derecha.
+
+La linea es una secuencia con 0 (vacia), 1 (pintada) o UNKNOWN. Primero se calcula, de derecha
+a izquierda, si los bloques k.. caben desde la celda i respetando lo conocido; con eso la
+colocacion mas a la izquierda se arma bloque por bloque sin retroceder, y la mas a la derecha
+es la mas a la izquierda de la linea invertida. Las celdas que el bloque k cubre en ambas
+colocaciones quedan pintadas, y las que ningun bloque alcanza en ninguna colocacion quedan vacias.
+"""
+
+UNKNOWN = 2
+
+
+def _fit_table(clue, line):
+    n = len(line)
+    K = len(clue)
+    ones = [0] * (n + 1)
+    zeros = [0] * (n + 1)
+    for i, value in enumerate(line):
+        ones[i + 1] = ones[i] + (value == 1)
+        zeros[i + 1] = zeros[i] + (value == 0)
+
+    def fits(block, i):
+        end = i + block
+        return end <= n and zeros[end] == zeros[i] and (end == n or line[end] != 1)
+
+    # fit[k][i]: los bloques k.. caben en line[i:] y las celdas que no cubren pueden quedar vacias
+    # (con una posicion n + 1 igual a la n para no recortar el indice tras el ultimo bloque)
+    fit = [[False] * (n + 2) for _ in range(K + 1)]
+    for i in range(n + 1):
+        fit[K][i] = ones[n] == ones[i]
+    fit[K][n + 1] = True
+    for k in range(K - 1, -1, -1):
+        block = clue[k]
+        row, next_row = fit[k], fit[k + 1]
+        for i in range(n, -1, -1):
+            row[i] = (i < n and line[i] != 1 and row[i + 1]) or (fits(block, i) and next_row[i + block + 1])
+        row[n + 1] = row[n]
+    return fit, fits
+
+
+def _leftmost(clue, line):
+    n = len(line)
+    fit, fits = _fit_table(clue, line)
+    if not fit[0][0]:
+        return None
+
+    starts = []
+    position = 0
+    for k, block in enumerate(clue):
+        start = position
+        while not (fits(block, start) and fit[k + 1][start + block + 1]):
+            start += 1
+        starts.append(start)
+        position = start + block + 1
+    return starts
+
+
+def count_placements(clue, line):
+    # Cuantas colocaciones de la pista son compatibles con las celdas conocidas (la misma tabla
+    # de _leftmost, contando en vez de solo decidir si cabe)
+    n = len(line)
+    clue = [block for block in clue if block > 0]
+    ones = [0] * (n + 1)
+    zeros = [0] * (n + 1)
+    for i, value in enumerate(line):
+        ones[i + 1] = ones[i] + (value == 1)
+        zeros[i + 1] = zeros[i] + (value == 0)
+
+    count = [int(ones[n] == ones[i]) for i in range(n + 1)]
+    for block in reversed(clue):
+        next_count = count
+        count = [0] * (n + 1)
+        for i in range(n, -1, -1):
+            total = count[i + 1] if i < n and line[i] != 1 else 0
+            end = i + block
+            if end <= n and zeros[end] == zeros[i] and (end == n or line[end] != 1):
+                total += next_count[min(end + 1, n)]
+            count[i] = total
+    return count[0]
+
+
+def solve_line(clue, line):
+    n = len(line)
+    clue = [block for block in clue if block > 0]
+    if not clue:
+        if 1 in line:
+            return None
+        return [0] * n
+
+    left = _leftmost(clue, line)
+    if left is None:
+        return None
+    reversed_starts = _leftmost(clue[::-1], line[::-1])
+    right = [n - start - block for start, block in zip(reversed_starts[::-1], clue)]
+
+    result = list(line)
+    covered = [False] * n
+    for block, left_start, right_start in zip(clue, left, right):
+        # Interseccion de las dos colocaciones del bloque
+        for i in range(right_start, left_start + block):
+            result[i] = 1
+        for i in range(left_start, right_start + block):
+            covered[i] = True
+    for i in range(n):
+        if not covered[i]:
+            result[i] = 0
+    return result
+
+
+def settle_line(clue, line):
+    # Version exacta de solve_line: deduce toda celda en que coinciden todas las colocaciones
+    # compatibles. Usa la tabla de _leftmost en los dos sentidos: un bloque puede empezar en s
+    # si cabe ahi, los bloques anteriores caben a su izquierda y los siguientes a su derecha
+    n = len(line)
+    clue = [block for block in clue if block > 0]
+    K = len(clue)
+    fit, fits = _fit_table(clue, line)
+    if not fit[0][0]:
+        return None
+    # fit_left[K - k][n - i]: los bloques ..k-1 caben en line[:i]
+    fit_left, _ = _fit_table(clue[::-1], line[::-1])
+
+    can_fill = [0] * (n + 1)
+    for k, block in enumerate(clue):
+        after, before = fit[k + 1], fit_left[K - k]
+        for s in range(n - block + 1):
+            if fits(block, s) and (s == 0 or line[s - 1] != 1) and after[s + block + 1] and before[n - s + 1]:
+                can_fill[s] += 1
+                can_fill[s + block] -= 1
+
+    result = list(line)
+    covered = 0
+    for i in range(n):
+        covered += can_fill[i]
+        can_empty = line[i] != 1 and any(fit[k][i + 1] and fit_left[K - k][n - i] for k in range(K + 1))
+        if not covered:
+            result[i] = 0
+        elif not can_empty:
+            result[i] = 1
+    return result
+
+
+@lru_cache(maxsize=None)
+def _line_automaton(clue):
+    # Automata de la pista con un bit por estado: el 0 es el inicio, despues el hueco inicial,
+    # las celdas de cada bloque con su hueco obligatorio y el hueco final. Devuelve las mascaras
+    # de los estados de hueco (leen 0 y se repiten), de los de bloque (leen 1) y de aceptacion
+    ones = 0
+    state = 1
+    gaps = 1 << state
+    for block in clue:
+        for _ in range(block):
+            state += 1
+            ones |= 1 << state
+        accept = 1 << state
+        state += 1
+        gaps |= 1 << state
+    accept = (accept if clue else 1) | 1 << state
+    return gaps, ones, accept
+
+
+def explain_line(clue, line, reasons, target=None):
+    # Celdas conocidas de la linea (posiciones) que bastan para su contradiccion o, con
+    # target = (k, valor), para deducir ese valor en k. Se sueltan por grupos de igual razon,
+    # de la mas alta a la mas baja, y un grupo queda si sin el la linea vuelve a tener
+    # colocaciones: la razon que resulta queda en los niveles mas bajos que se pueda
+    groups = {}
+    for k, value in enumerate(line):
+        if value != UNKNOWN:
+            groups.setdefault(reasons[k], []).append(k)
+    if len(groups) < 2:
+        return [k for group in groups.values() for k in group]
+
+    gaps, ones, accept = _line_automaton(tuple(block for block in clue if block > 0))
+    masks = (gaps, ones, gaps | ones)
+    values, line = line, list(line)
+    if target is not None:
+        line[target[0]] = 1 - target[1]
+
+    kept = []
+    for reason in sorted(groups, reverse=True):
+        group = groups[reason]
+        for k in group:
+            line[k] = UNKNOWN
+        # Si la linea todavia tiene colocaciones: se simula el automata con todos sus estados a
+        # la vez (avanzar, quedarse en un hueco o saltar el hueco inicial)
+        active = 1
+        for value in line:
+            active = ((active << 1) | (active & gaps) | (active & 1) << 2) & masks[value]
+            if not active:
+                break
+        if active & accept:
+            for k in group:
+                line[k] = values[k]
+            kept += group
+    return kept
+
+
+class LineReasons:
+    """
+    Razones por celda para explain_propagate: una mascara de bits por celda, por ejemplo los
+    niveles de decision de los que depende. La razon de una celda deducida se guarda como la
+    linea de la que salio y se calcula recien cuando se pide (muchas deducciones no llegan a
+    ningun conflicto): es el OR de las razones de las celdas que elige explain_line. Las lineas
+    guardadas solo miran celdas fijadas antes, asi que siguen valiendo mientras la celda
+    deducida siga fijada.
+    """
+    __slots__ = ('entries',)
+
+    def __init__(self, size):
+        self.entries = [0] * size
+
+    def __getitem__(self, index):
+        entry = self.entries[index]
+        if entry.__class__ is int:
+            return entry
+        return self._resolve(index)
+
+    def __setitem__(self, index, reason):
+        self.entries[index] = reason
+
+    def defer(self, clue, line, indices, deduced):
+        entries = self.entries
+        reason = 0
+        for i, value in zip(indices, line):
+            if value != UNKNOWN:
+                entry = entries[i]
+                if entry.__class__ is not int:
+                    break
+                reason |= entry
+        else:
+            if reason & (reason - 1) == 0:
+                # Con un solo nivel (o ninguno) en la linea no hay nada que achicar
+                for k, _ in deduced:
+                    entries[indices[k]] = reason
+                return
+        for k, new in deduced:
+            entries[indices[k]] = (clue, line, indices, (k, new))
+
+    def explain(self, clue, line, indices, target=None):
+        line_reasons = [self[i] if value != UNKNOWN else 0 for i, value in zip(indices, line)]
+        reason = 0
+        for k in explain_line(clue, line, line_reasons, target):
+            reason |= line_reasons[k]
+        return reason
+
+    def _resolve(self, index):
+        # Con una pila propia: las cadenas de deducciones pasan el limite de recursion
+        entries = self.entries
+        stack = [index]
+        while stack:
+            top = stack[-1]
+            entry = entries[top]
+            if entry.__class__ is int:
+                stack.pop()
+                continue
+            clue, line, indices, target = entry
+            pending = [i for i, value in zip(indices, line) if value != UNKNOWN and entries[i].__class__ is not int]
+            if pending:
+                stack.extend(pending)
+                continue
+            line_reasons = [entries[i] if value != UNKNOWN else 0 for i, value in zip(indices, line)]
+            reason = 0
+            for k in explain_line(clue, line, line_reasons, target):
+                reason |= line_reasons[k]
+            entries[top] = reason
+            stack.pop()
+        return entries[index]
+
+
+# Celdas (0, 1, UNKNOWN) a digitos '0'/'1' de las mascaras filled y empty
+_FILLED_DIGITS = bytes.maketrans(b'\x00\x01\x02', b'010')
+_EMPTY_DIGITS = bytes.maketrans(b'\x00\x01\x02', b'100')
+
+
+def line_masks(line):
+    # line son los bytes de la linea; el bit k de cada mascara es la celda k
+    line = bytes(line)
+    return int(line.translate(_FILLED_DIGITS)[::-1] or b'0', 2), int(line.translate(_EMPTY_DIGITS)[::-1] or b'0', 2)
+
+
+class LineCache:
+    """
+    Resultados de solve_line por (pista, largo, filled, empty), con las celdas conocidas como
+    mascaras, guardados como las mascaras deducidas o None si la linea no tiene solucion. Es
+    acotado: al pasar de capacity se descarta el usado hace mas tiempo (LRU). Puede compartirse
+    entre busquedas, porque el resultado depende solo de la pista y de la linea.
+    """
+
+    def __init__(self, capacity=100000):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def solve(self, clue, length, filled, empty, line):
+        key = (clue, length, filled, empty)
+        entries = self.entries
+        if key in entries:
+            self.hits += 1
+            entries.move_to_end(key)
+            return entries[key]
+        self.misses += 1
+        solved = solve_line(clue, list(line))
+        result = None if solved is None else line_masks(solved)
+        entries[key] = result
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+        return result
+
+
+# Cache compartido por las busquedas de un mismo proceso
+LINE_CACHE = LineCache()
+
+
+def propagate(cells, width, height, row_clues, col_clues, rows=None, cols=None, changed=None):
+    """
+    Aplica solve_line a filas y columnas hasta que nada cambie. cells es la grilla por filas con
+    0, 1 o UNKNOWN y se modifica en el lugar; changed recibe los indices de las celdas deducidas.
+    Solo se revisan las lineas entregadas y despues las que cruzan alguna celda que cambio.
+    """
+    return explain_propagate(cells, width, height, row_clues, col_clues, rows, cols, changed) is None
+
+
+def explain_propagate(cells, width, height, row_clues, col_clues, rows=None, cols=None, changed=None, reasons=None, cache=None):
+    """
+    Igual que propagate, pero devuelve None si no hay contradiccion o la razon de la contradiccion.
+    Con reasons (un LineReasons) cada celda deducida recibe como razon la de explain_line: el
+    OR de las razones de las celdas conocidas de su linea que hacen falta para forzar el valor.
+    Una contradiccion devuelve de la misma forma la razon de las celdas que la causan.
+    Con cache (un LineCache) los resultados de solve_line se buscan por las mascaras de la linea
+    y solo se recorren las celdas que cambiaron.
+    """
+    queue = [('row', r) for r in (range(height) if rows is None else rows)]
+    queue += [('col', c) for c in (range(width) if cols is None else cols)]
+    queued = set(queue)
+
+    while queue:
+        line = queue.pop()
+        queued.discard(line)
+        kind, index = line
+        if kind == 'row':
+            indices = range(index * width, (index + 1) * width)
+            clue = row_clues[index]
+        else:
+            indices = range(index, width * height, width)
+            clue = col_clues[index]
+
+        if cache is None:
+            values = [cells[i] for i in indices]
+            solved = solve_line(clue, values)
+            if solved is None:
+                return reasons.explain(clue, values, indices) if reasons is not None else 0
+            deduced = [(k, new) for k, (old, new) in enumerate(zip(values, solved)) if old != new]
+        else:
+            values = cells[indices.start:indices.stop:indices.step]
+            filled, empty = line_masks(values)
+            result = cache.solve(tuple(clue), len(indices), filled, empty, values)
+            if result is None:
+                return reasons.explain(clue, values, indices) if reasons is not None else 0
+            deduced = []
+            new_filled, new_empty = result[0] & ~filled, result[1] & ~empty
+            for mask, new in ((new_filled, 1), (new_empty, 0)):
+                while mask:
+                    low = mask & -mask
+                    deduced.append((low.bit_length() - 1, new))
+                    mask ^= low
+
+        if reasons is not None:
+            reasons.defer(clue, values, indices, deduced)
+        for k, new in deduced:
+            cell = indices[k]
+            cells[cell] = new
+            if changed is not None:
+                changed.append(cell)
+            crossing = ('col', cell % width) if kind == 'row' else ('row', cell // width)
+            if crossing not in queued:
+                queued.add(crossing)
+                queue.append(crossing)
+    return None
+
+
+class LineState:
+    """
+    Estado incremental de una linea que se asigna de a una celda, de izquierda a derecha (las
+    filas y columnas se llenan asi cuando la grilla se recorre por filas). Guarda cuantas celdas
+    van, el bloque actual de la pista, el largo de la racha de celdas pintadas que se esta armando
+    y, con need, cuanto espacio minimo piden los bloques que faltan. Asignar y desasignar es O(1).
+    """
+    __slots__ = ('clue', 'length', 'need', 'position', 'cursor', 'run', 'history')
+
+    def __init__(self, clue, length):
+        self.clue = [block for block in clue if block > 0]
+        self.length = length
+        # need[k]: celdas minimas que ocupan los bloques k.. con sus separaciones
+        count = len(self.clue)
+        self.need = [0] * (count + 1)
+        for k in range(count - 1, -1, -1):
+            self.need[k] = self.clue[k] + (self.need[k + 1] + 1 if k + 1 < count else 0)
+        self.position = 0
+        self.cursor = 0
+        self.run = 0
+        self.history = []
+
+    def _step(self, value):
+        clue = self.clue
+        cursor, run = self.cursor, self.run
+        if value == 1:
+            if cursor == len(clue) or run == clue[cursor]:
+                return None
+            run += 1
+            remaining = clue[cursor] - run + (self.need[cursor + 1] + 1 if cursor + 1 < len(clue) else 0)
+        else:
+            if run:
+                if run < clue[cursor]:
+                    return None
+                cursor += 1
+                run = 0
+            remaining = self.need[cursor]
+        # Lo que falta de la pista tiene que caber en las celdas que quedan
+        if remaining > self.length - self.position - 1:
+            return None
+        return cursor, run
+
+    def can_assign(self, value):
+        return self._step(value) is not None
+
+    def assign(self, value):
+        step = self._step(value)
+        if step is None:
+            return False
+        self.history.append((self.cursor, self.run))
+        self.cursor, self.run = step
+        self.position += 1
+        return True
+
+    def unassign(self):
+        self.cursor, self.run = self.history.pop()
+        self.position -= 1
@@ -0,0 +1,295 @@
+import argparse
+import time
+
+import numpy as np
+
+from nonogram_io import read_non
+from nonogram_lines import UNKNOWN
+
+
+"""
+Propagacion de nonogramas con NumPy: la grilla es un arreglo int8 (0, 1 o UNKNOWN) y en cada
+pasada se resuelven todas las filas juntas y despues todas las columnas juntas.
+
+El solver de linea es exacto: una celda queda en 1 (o 0) solo si todas las colocaciones de la
+pista compatibles con las celdas conocidas la llenan (o la dejan vacia). Para un lote de L lineas
+de largo n, con las pistas rellenadas por la izquierda con bloques vacios hasta K bloques:
+
+    fit[i, l, k]  los bloques k.. de la linea l caben en line[i:]
+    pre[j, l, k]  los bloques ..k-1 caben en line[:j]
+
+Las dos tablas se llenan con un ciclo de Python sobre las posiciones (n pasos) en que cada paso
+es una operacion sobre los (L, K) pares linea-bloque. Con ellas, un bloque puede empezar en s si
+sus celdas no tienen vacias, lo que queda a cada lado cabe, y los bloques vecinos no lo tocan;
+las celdas que puede cubrir salen de una suma acumulada de esos inicios. Una pasada completa
+(filas y columnas) sobre una grilla aleatoria de 100x100 con hasta 31 bloques por linea toma
+unos 20 ms, contra 160 ms de nonogram_lines.propagate hasta el punto fijo.
+
+Las sumas acumuladas de celdas llenas y vacias (y np.diff en check_grid) reemplazan a los
+recorridos por celda con groupby y listas de los scripts. solve_grid agrega backtracking sobre
+esta propagacion y esta en nonogram_search.ENGINES como 'numpy', asi que Nonogram-benchmark lo
+compara con los motores de propagacion escalar.
+"""
+
+
+def _nonempty(clues):
+    # Las pistas sin los bloques de largo 0 (una linea vacia puede venir como [0])
+    return [[block for block in clue if block > 0] for clue in clues]
+
+
+def pad_clues(clues):
+    # Pistas como arreglo (L, K) de largos de bloque, rellenadas por la izquierda con ceros;
+    # first[l] es el indice del primer bloque real de la linea l
+    clues = _nonempty(clues)
+    width = max((len(clue) for clue in clues), default=0)
+    blocks = np.zeros((len(clues), width), dtype=np.int64)
+    first = np.empty(len(clues), dtype=np.int64)
+    for index, clue in enumerate(clues):
+        if clue:
+            blocks[index, width - len(clue):] = clue
+        first[index] = width - len(clue)
+    return blocks, first
+
+
+class LinePlan:
+    """
+    Lo que depende solo de las pistas y del largo de las lineas, calculado una vez por puzzle:
+    para cada posicion, linea y bloque, donde terminaria el bloque si empezara ahi y donde
+    empezaria si terminara ahi. Los arreglos van con la posicion primero, asi cada paso de los
+    ciclos sobre posiciones trabaja sobre memoria contigua; los *_at son indices planos en los
+    arreglos (posicion, linea) de solve_lines.
+    """
+
+    def __init__(self, clues, length):
+        self.blocks, self.first = pad_clues(clues)
+        self.length = length
+        count, width = self.blocks.shape
+        positions = np.arange(length + 1)[:, None, None]
+        lines = np.arange(count)[None, :, None]
+        end = positions + self.blocks[None, :, :]
+        begin = positions - self.blocks[None, :, :]
+
+        self.real = np.arange(width)[None, :] >= self.first[:, None]
+        self.end_inside = end <= length
+        self.end_at = (np.minimum(end, length) * count + lines).astype(np.int32)
+        self.after = np.minimum(end + 1, length).astype(np.int32)
+        self.begin_inside = begin >= 0
+        self.begin_at = (np.maximum(begin, 0) * count + lines).astype(np.int32)
+        self.begin_edge = begin <= 0
+        self.before = np.maximum(begin - 1, 0).astype(np.int32)
+        self.before_at = (self.before * count + lines).astype(np.int32)
+        self.low = np.maximum(positions[:-1] - self.blocks[None, :, :] + 1, 0).astype(np.int32)
+
+
+def solve_lines(lines, plan, active=None):
+    """
+    Resuelve un lote de lineas (L, n) con el LinePlan de sus pistas; active es una mascara (L,)
+    de las lineas a resolver (por omision todas). Devuelve las lineas activas con las celdas
+    deducidas y una mascara de las que no tienen ninguna colocacion compatible.
+    """
+    n = plan.length
+    chosen = slice(None) if active is None else np.flatnonzero(active)
+
+    # Por posicion y linea: sumas acumuladas de llenas y vacias; not_one[n] es el borde de la linea
+    columns = lines.T
+    not_one = np.ones((n + 1, lines.shape[0]), dtype=bool)
+    not_one[:n] = columns != 1
+    ones = np.zeros((n + 1, lines.shape[0]), dtype=np.int32)
+    zeros = np.zeros((n + 1, lines.shape[0]), dtype=np.int32)
+    np.cumsum(columns == 1, axis=0, out=ones[1:])
+    np.cumsum(columns == 0, axis=0, out=zeros[1:])
+
+    first = plan.first[chosen]
+    real = plan.real[chosen]
+    after = plan.after[:, chosen]
+    before = plan.before[:, chosen]
+    count, width = real.shape
+    line_not_one = not_one[:, chosen]
+    line_zeros = zeros[:, chosen, None]
+
+    # Bloque k empezando en i: no pisa vacias y la celda siguiente puede quedar vacia
+    end_at = plan.end_at[:, chosen]
+    start_fits = plan.end_inside[:, chosen] & (zeros.take(end_at) == line_zeros) & not_one.take(end_at)
+    # Bloque k terminando en j: no pisa vacias y la celda anterior puede quedar vacia
+    begin_at = plan.begin_at[:, chosen]
+    end_fits = plan.begin_inside[:, chosen] & (zeros.take(begin_at) == line_zeros) & (plan.begin_edge[:, chosen] | not_one.take(plan.before_at[:, chosen]))
+
+    # fit[i, l, k]: los bloques k.. caben en line[i:]; la fila n + 1 es un borde en False
+    stride = count * (width + 1)
+    cells = np.arange(count)[:, None] * (width + 1) + np.arange(width)[None, :]
+    fit = np.zeros((n + 2, count, width + 1), dtype=bool)
+    fit_flat = fit.reshape(-1)
+    fit[:n + 1, :, width] = (ones[n] == ones)[:, chosen]
+    fit_at = after * stride + (cells + 1)
+    for i in range(n, -1, -1):
+        fit[i, :, :width] = (line_not_one[i, :, None] & fit[i + 1, :, :width]) | (start_fits[i] & fit_flat.take(fit_at[i]))
+
+    # pre[j, l, k]: los bloques ..k-1 caben en line[:j]; los bloques de relleno no ocupan nada
+    empty_prefix = (ones == 0)[:, chosen]
+    padding = np.arange(1, width + 1)[None, :] <= first[:, None]
+    pre = np.zeros((n + 1, count, width + 1), dtype=bool)
+    pre_flat = pre.reshape(-1)
+    pre[0] = np.arange(width + 1)[None, :] <= first[:, None]
+    pre_at = before * stride + cells
+    for j in range(1, n + 1):
+        placed = (line_not_one[j - 1, :, None] & pre[j - 1, :, 1:]) | (end_fits[j] & pre_flat.take(pre_at[j]))
+        pre[j, :, 1:] = np.where(padding, empty_prefix[j, :, None], placed)
+        pre[j, :, 0] = empty_prefix[j]
+
+    # Inicios posibles de cada bloque real: lo anterior cabe antes de la celda s - 1 (vacia)
+    left_ok = np.empty((n + 1, count, width), dtype=bool)
+    left_ok[0] = pre[0, :, :width]
+    left_ok[1:] = line_not_one[:n, :, None] & pre[:n, :, :width]
+    starts = start_fits & left_ok & fit_flat.take(fit_at) & real
+
+    # La celda i la puede cubrir el bloque k si hay un inicio posible en (i - largo, i]
+    covered = np.zeros((n + 1, count, width), dtype=np.int32)
+    np.cumsum(starts[:n], axis=0, out=covered[1:])
+    low = plan.low[:, chosen] * (count * width) + (np.arange(count)[:, None] * width + np.arange(width)[None, :])
+    can_fill = ((covered[1:] - covered.reshape(-1).take(low)) > 0).any(axis=2)
+
+    # La celda i puede quedar vacia si para algun corte k los bloques ..k-1 caben antes y k.. despues
+    cuts = np.arange(width + 1)[None, :] >= first[:, None]
+    can_empty = line_not_one[:n] & (pre[:n] & fit[1:n + 1] & cuts).any(axis=2)
+
+    solved = np.where(can_fill & ~can_empty, 1, np.where(can_empty & ~can_fill, 0, UNKNOWN)).astype(np.int8)
+    return solved.T, ~(can_fill | can_empty).all(axis=0)
+
+
+class GridPropagator:
+    def __init__(self, row_clues, col_clues):
+        self.height = len(row_clues)
+        self.width = len(col_clues)
+        self.row_plan = LinePlan(row_clues, self.width)
+        self.col_plan = LinePlan(col_clues, self.height)
+
+    def new_grid(self):
+        return np.full((self.height, self.width), UNKNOWN, dtype=np.int8)
+
+    def _solve(self, lines, plan, active):
+        # Solo se resuelven las lineas activas; devuelve las que cambiaron o None si hay contradiccion
+        solved, failed = solve_lines(lines, plan, active)
+        if failed.any():
+            return None
+        changed = solved != lines[active]
+        lines[active] = solved
+        return changed
+
+    def propagate(self, grid, rows=None, cols=None):
+        """
+        Alterna pasadas de filas y de columnas sobre grid (se modifica en el lugar) hasta que nada
+        cambie. Devuelve False si alguna linea no tiene colocaciones. rows/cols son mascaras de las
+        lineas a revisar primero (por omision todas); despues solo se revisan las que cruzan una
+        celda que cambio. sweeps cuenta las pasadas hechas.
+        """
+        active_rows = np.ones(self.height, dtype=bool) if rows is None else np.asarray(rows, dtype=bool)
+        active_cols = np.ones(self.width, dtype=bool) if cols is None else np.asarray(cols, dtype=bool)
+        self.sweeps = 0
+        while active_rows.any() or active_cols.any():
+            if active_rows.any():
+                changed = self._solve(grid, self.row_plan, active_rows)
+                self.sweeps += 1
+                if changed is None:
+                    return False
+                active_cols |= changed.any(axis=0)
+                active_rows[:] = False
+            if active_cols.any():
+                changed = self._solve(grid.T, self.col_plan, active_cols)
+                self.sweeps += 1
+                if changed is None:
+                    return False
+                active_rows |= changed.any(axis=0)
+                active_cols[:] = False
+        return True
+
+
+def _run_lengths(lines):
+    # Largos de los bloques de cada linea completa, con np.diff sobre la linea con bordes vacios
+    padded = np.zeros((lines.shape[0], lines.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = lines
+    edges = np.diff(padded, axis=1)
+    runs = []
+    for line_edges in edges:
+        starts = np.flatnonzero(line_edges == 1)
+        ends = np.flatnonzero(line_edges == -1)
+        runs.append((ends - starts).tolist())
+    return runs
+
+
+def check_grid(grid, row_clues, col_clues):
+    if (grid == UNKNOWN).any():
+        return False
+    return _run_lengths(grid) == _nonempty(row_clues) and _run_lengths(grid.T) == _nonempty(col_clues)
+
+
+def solve_grid(row_clues, col_clues, node_limit=None, time_limit=None):
+    """
+    Backtracking sobre GridPropagator, con la misma firma y resultado que los motores de
+    nonogram_search.ENGINES: (estado, grilla, nodos, backtracks). Se ramifica en la primera celda
+    desconocida por filas, probando 0 y despues 1; cada hijo es una copia de la grilla en que se
+    propagan primero la fila y la columna de la celda. Guardar copias en vez de un trail cuesta
+    alto*ancho bytes por nivel, poco al lado de una pasada de solve_lines.
+    """
+    start_time = time.perf_counter()
+    propagator = GridPropagator(row_clues, col_clues)
+    height, width = propagator.height, propagator.width
+    grid = propagator.new_grid()
+    if not propagator.propagate(grid):
+        return 'unsat', None, 0, 0
+
+    node_count = backtrack_count = 0
+    # Pila de (grilla padre, celda, valor) por probar; el 0 se apila despues para probarlo primero
+    stack = []
+    while True:
+        unknown = np.flatnonzero(grid.ravel() == UNKNOWN)
+        if len(unknown) == 0:
+            return 'solved', grid.tolist(), node_count, backtrack_count
+        if node_limit is not None and node_count >= node_limit:
+            return 'limit', None, node_count, backtrack_count
+        if time_limit is not None and time.perf_counter() - start_time > time_limit:
+            return 'limit', None, node_count, backtrack_count
+        node_count += 1
+        stack.append((grid, unknown[0], 1))
+        stack.append((grid, unknown[0], 0))
+
+        while True:
+            if not stack:
+                return 'unsat', None, node_count, backtrack_count
+            parent, index, value = stack.pop()
+            grid = parent.copy()
+            row, col = divmod(int(index), width)
+            grid[row, col] = value
+            rows = np.zeros(height, dtype=bool)
+            cols = np.zeros(width, dtype=bool)
+            rows[row] = cols[col] = True
+            if propagator.propagate(grid, rows, cols):
+                break
+            backtrack_count += 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Propagar un nonograma con el solver de lineas vectorizado.")
+    parser.add_argument("puzzle", type=str, help="Archivo .non con las pistas")
+    parser.add_argument("--repeat", type=int, default=10, help="Veces que se mide la propagacion completa")
+    args = parser.parse_args()
+
+    row_clues, col_clues, _ = read_non(args.puzzle)
+    propagator = GridPropagator(row_clues, col_clues)
+
+    best = float('inf')
+    for _ in range(args.repeat):
+        grid = propagator.new_grid()
+        start_time = time.perf_counter()
+        consistent = propagator.propagate(grid)
+        best = min(best, time.perf_counter() - start_time)
+
+    for row in grid:
+        print("".join("#" if cell == 1 else "." if cell == 0 else "?" for cell in row))
+    if not consistent:
+        print("Contradiccion: el puzzle no tiene solucion")
+    elif check_grid(grid, row_clues, col_clues):
+        print("Resuelto solo con propagacion")
+    else:
+        print(f"Celdas sin decidir: {int((grid == UNKNOWN).sum())}")
+    print(f"Pasadas: {propagator.sweeps}")
+    print(f"Tiempo de propagacion: {best:.4f} segundos")
@@ -0,0 +1,235 @@
+import time
+
+from nonogram_lines import (UNKNOWN, cells_from_line, compatible_patterns, count_placements, filter_patterns,
+                            line_from_cells, line_patterns, pattern_consensus, settle_line)
+
+
+"""
+Solver por lineas: el dominio de cada fila y columna es el conjunto de sus colocaciones validas
+(ver nonogram_lines.line_patterns) en vez de {0, 1} por celda.
+
+La propagacion filtra las colocaciones de una linea contra sus celdas conocidas, deduce las
+celdas en que coinciden todas las que quedan y avisa a las lineas que cruzan esas celdas. La
+busqueda ramifica sobre una linea a la que solo le quedan dos colocaciones o, si no hay, sobre
+la primera celda desconocida en orden de filas.
+
+Las lineas largas con pistas cortas tienen millones de colocaciones. Mientras una linea tenga
+mas de MAX_PATTERNS su dominio queda implicito: solo se cuenta (count_placements) y se deduce
+con settle_line; se enumera (compatible_patterns, ya filtrado por las celdas conocidas) cuando
+las celdas fijadas bajan la cuenta.
+"""
+
+
+MAX_PATTERNS = 2000
+
+# Resultado de search cuando se acaba node_limit o el tiempo
+LIMIT = 'limit'
+
+
+class LineDomains:
+    def __init__(self, row_clues, col_clues):
+        self.height = len(row_clues)
+        self.width = len(col_clues)
+        self.row_clues = [tuple(clue) for clue in row_clues]
+        self.col_clues = [tuple(clue) for clue in col_clues]
+        # None si el dominio es implicito; la cuenta de colocaciones se guarda siempre
+        self.row_counts = [count_placements(clue, [UNKNOWN] * self.width) for clue in self.row_clues]
+        self.col_counts = [count_placements(clue, [UNKNOWN] * self.height) for clue in self.col_clues]
+        self.rows = [list(line_patterns(clue, self.width)) if count <= MAX_PATTERNS else None
+                     for clue, count in zip(self.row_clues, self.row_counts)]
+        self.cols = [list(line_patterns(clue, self.height)) if count <= MAX_PATTERNS else None
+                     for clue, count in zip(self.col_clues, self.col_counts)]
+        self.row_filled = [0] * self.height
+        self.row_empty = [0] * self.height
+        self.col_filled = [0] * self.width
+        self.col_empty = [0] * self.width
+
+    def copy(self):
+        other = LineDomains.__new__(LineDomains)
+        other.height, other.width = self.height, self.width
+        other.row_clues, other.col_clues = self.row_clues, self.col_clues
+        other.row_counts, other.col_counts = self.row_counts[:], self.col_counts[:]
+        other.rows, other.cols = self.rows[:], self.cols[:]
+        other.row_filled, other.row_empty = self.row_filled[:], self.row_empty[:]
+        other.col_filled, other.col_empty = self.col_filled[:], self.col_empty[:]
+        return other
+
+    def _revise(self, domains, counts, clues, filled, empty, crossing_filled, crossing_empty, index, length, dirty):
+        if domains[index] is None:
+            cells = cells_from_line(filled[index], empty[index], length)
+            count = count_placements(clues[index], cells)
+            if count == 0:
+                return False
+            if count <= MAX_PATTERNS:
+                domains[index] = compatible_patterns(clues[index], length, filled[index], empty[index])
+            else:
+                # Sigue implicita: deducir sin enumerar las colocaciones
+                counts[index] = count
+                always, never = line_from_cells(settle_line(clues[index], cells))
+
+        if domains[index] is not None:
+            patterns = filter_patterns(domains[index], filled[index], empty[index])
+            if not patterns:
+                return False
+            domains[index] = patterns
+            counts[index] = len(patterns)
+            always, never = pattern_consensus(patterns, (1 << length) - 1)
+
+        new_filled = always & ~filled[index]
+        new_empty = never & ~empty[index]
+        filled[index] |= new_filled
+        empty[index] |= new_empty
+
+        # Avisar a las lineas que cruzan las celdas recien deducidas
+        bit = 1 << index
+        for k in range(length):
+            if new_filled >> k & 1:
+                crossing_filled[k] |= bit
+                dirty.add(k)
+            elif new_empty >> k & 1:
+                crossing_empty[k] |= bit
+                dirty.add(k)
+        return True
+
+    def propagate(self, rows=None, cols=None):
+        dirty_rows = set(range(self.height)) if rows is None else set(rows)
+        dirty_cols = set(range(self.width)) if cols is None else set(cols)
+        while dirty_rows or dirty_cols:
+            while dirty_rows:
+                r = dirty_rows.pop()
+                if not self._revise(self.rows, self.row_counts, self.row_clues, self.row_filled, self.row_empty,
+                                    self.col_filled, self.col_empty, r, self.width, dirty_cols):
+                    return False
+            while dirty_cols:
+                c = dirty_cols.pop()
+                if not self._revise(self.cols, self.col_counts, self.col_clues, self.col_filled, self.col_empty,
+                                    self.row_filled, self.row_empty, c, self.height, dirty_rows):
+                    return False
+        return True
+
+    def select_line(self):
+        # La linea con menos colocaciones restantes (sin contar las ya resueltas)
+        best = None
+        best_size = float('inf')
+        for is_row, counts in ((True, self.row_counts), (False, self.col_counts)):
+            for index, count in enumerate(counts):
+                if 1 < count < best_size:
+                    best, best_size = (is_row, index), count
+        return best
+
+    def first_unknown(self):
+        full = (1 << self.width) - 1
+        for row in range(self.height):
+            known = self.row_filled[row] | self.row_empty[row]
+            if known != full:
+                return row, (~known & (known + 1)).bit_length() - 1
+        return None
+
+    def set_cell(self, row, col, value):
+        if value:
+            self.row_filled[row] |= 1 << col
+            self.col_filled[col] |= 1 << row
+        else:
+            self.row_empty[row] |= 1 << col
+            self.col_empty[col] |= 1 << row
+
+    def grid(self):
+        return [[filled >> col & 1 for col in range(self.width)] for filled in self.row_filled]
+
+
+def search(domains, node_count, backtrack_count, node_limit=None, deadline=None):
+    selected = domains.select_line()
+    if selected is None:
+        return domains, node_count, backtrack_count
+    if node_limit is not None and node_count >= node_limit:
+        return LIMIT, node_count, backtrack_count
+    if deadline is not None and time.perf_counter() > deadline:
+        return LIMIT, node_count, backtrack_count
+
+    node_count += 1
+    is_row, index = selected
+    patterns = (domains.rows if is_row else domains.cols)[index]
+    # Una linea con dos colocaciones es una eleccion binaria; si no, se ramifica sobre la primera
+    # celda desconocida en orden de filas, probando primero pintarla
+    branch_on_cell = patterns is None or len(patterns) > 2
+    if branch_on_cell:
+        row, col = domains.first_unknown()
+        choices = [(row, col, 1), (row, col, 0)]
+    else:
+        choices = patterns
+
+    for choice in choices:
+        child = domains.copy()
+        if branch_on_cell:
+            child.set_cell(*choice)
+            consistent = child.propagate(rows=[choice[0]], cols=[choice[1]])
+        elif is_row:
+            child.rows[index] = [choice]
+            consistent = child.propagate(rows=[index], cols=[])
+        else:
+            child.cols[index] = [choice]
+            consistent = child.propagate(rows=[], cols=[index])
+
+        if consistent:
+            result, node_count, backtrack_count = search(child, node_count, backtrack_count, node_limit, deadline)
+            if result:
+                return result, node_count, backtrack_count
+        else:
+            backtrack_count += 1
+
+    return None, node_count, backtrack_count
+
+
+def solve_nonogram(row_clues, col_clues):
+    domains = LineDomains(row_clues, col_clues)
+    if not domains.propagate():
+        print("No solution found")
+        return None, 0, 0
+
+    result, node_count, backtrack_count = search(domains, 0, 0)
+    if result:
+        return result.grid(), node_count, backtrack_count
+    else:
+        print("No solution found")
+        return None, node_count, backtrack_count
+
+
+if __name__ == "__main__":
+    row_clues = [
+        [4],
+        [8],
+        [10],
+        [1, 1, 2, 1, 1],
+        [1, 1, 2, 1, 1],
+        [1, 6, 1],
+        [6],
+        [2, 2],
+        [4],
+        [2]
+    ]
+
+    col_clues = [
+        [4],
+        [2],
+        [7],
+        [3, 4],
+        [7, 2],
+        [7, 2],
+        [3, 4],
+        [7],
+        [2],
+        [4]
+    ]
+
+    start_time = time.perf_counter()
+    solution, node_count, backtrack_count = solve_nonogram(row_clues, col_clues)
+    end_time = time.perf_counter()
+
+    if solution:
+        for row in solution:
+            print("".join("#" if cell == 1 else "." for cell in row))
+
+    elapsed_time = end_time - start_time
+    print(f"Tiempo de ejecución: {elapsed_time:.4f} segundos")
+    print(f"Nodos generados: {node_count}")
+    print(f"Nodos con backtracking: {backtrack_count}")
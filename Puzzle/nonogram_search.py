@@ -0,0 +1,433 @@
+import time
+from collections import deque
+
+from nonogram_lines import LINE_CACHE, UNKNOWN, LineReasons, LineState, explain_propagate
+from nonogram_patterns import LIMIT, LineDomains, search
+
+
+"""
+Busqueda iterativa para los scripts de nonogramas, con la pila de decisiones explicita.
+
+La grilla es un bytearray por filas (0, 1 o UNKNOWN). Las celdas se recorren por filas y cada
+celda ya conocida se pasa a los LineState de su fila y su columna; en la primera celda
+desconocida se abre un nodo que prueba 0 y despues 1. Un nodo de la pila guarda la celda, el
+siguiente valor que falta probar, el largo del trail y cuantas celdas se habian pasado a los
+estados de linea, asi que volver a un nodo es deshacer el trail y los estados hasta esas marcas.
+
+Con propagation=True, despues de cada decision se propaga su fila y su columna hasta el punto
+fijo (nonogram_lines.propagate); con False solo se usan los chequeos de LineState.
+
+Con backjumping=True cada celda conocida guarda como razon una mascara de bits con los niveles
+de decision de los que depende: su propio nivel si es una decision y, si la dedujo la
+propagacion, la razon de las celdas de su linea que hacen falta para deducirla
+(nonogram_lines.explain_line). Cuando un valor falla, la razon del fallo se acumula en el nodo;
+si no incluye el nivel del nodo, el otro valor falla igual y no se prueba. Cuando se agotan los
+valores se salta directo al nivel mas alto del conflicto (los nodos intermedios no tuvieron que
+ver) y las decisiones del conflicto se guardan como nogood, en una tabla acotada (FIFO) con dos
+literales vigilados por nogood, que poda ramas que repiten esa combinacion mas adelante.
+
+count_solutions sigue la busqueda despues de cada solucion (para verificar que un puzzle tenga
+solucion unica hay que agotar el arbol). Con propagacion los resultados de solve_line se buscan
+en un LineCache (por omision nonogram_lines.LINE_CACHE, compartido por las busquedas del
+proceso): en una busqueda que recorre todo el arbol los mismos estados parciales de las lineas se
+repiten casi siempre, y contar dos soluciones en grillas de 25x25 baja de 11-17 s a 2.5-4 s.
+
+run() se puede cortar por pause(), node_limit o time_limit y se retoma llamandolo de nuevo.
+"""
+
+
+class NogoodStore:
+    """
+    Nogoods aprendidos: listas de (celda, valor) que no pueden darse todas juntas. Cada nogood se
+    vigila por dos de sus literales que no se cumplen; solo cuando uno de ellos pasa a cumplirse se
+    busca otro que no se cumpla para vigilar, y si no hay y el otro vigilado tambien se cumple, el
+    nogood esta violado. Deshacer celdas no toca las vigilancias.
+    """
+
+    def __init__(self, capacity=10000, max_size=32):
+        self.capacity = capacity
+        self.max_size = max_size
+        self.nogoods = {}
+        self.order = deque()
+        self.watches = {}
+        self.next_id = 0
+        self.learned = 0
+        self.pruned = 0
+
+    def add(self, literals):
+        if not literals or len(literals) > self.max_size:
+            return
+        key = self.next_id
+        self.next_id += 1
+        self.nogoods[key] = literals
+        self.order.append(key)
+        for literal in literals[:2]:
+            self.watches.setdefault(literal, []).append(key)
+        self.learned += 1
+        while len(self.order) > self.capacity:
+            # Las listas de vigilancia se limpian de a poco al revisarlas
+            del self.nogoods[self.order.popleft()]
+
+    def violated(self, cells, indices):
+        # Algun nogood que se cumpla entero despues de fijar estas celdas
+        nogoods, watches = self.nogoods, self.watches
+        for index in indices:
+            literal = (index, cells[index])
+            keys = watches.get(literal)
+            if not keys:
+                continue
+            kept = []
+            found = None
+            for position, key in enumerate(keys):
+                literals = nogoods.get(key)
+                if literals is None:
+                    continue
+                if found is not None:
+                    kept.append(key)
+                    continue
+                if literals[0] != literal:
+                    literals[0], literals[1] = literals[1], literals[0]
+                for k in range(2, len(literals)):
+                    cell, value = literals[k]
+                    if cells[cell] != value:
+                        literals[0], literals[k] = literals[k], literals[0]
+                        watches.setdefault(literals[0], []).append(key)
+                        break
+                else:
+                    kept.append(key)
+                    cell, value = literals[1] if len(literals) > 1 else literal
+                    if cells[cell] == value:
+                        found = literals
+            keys[:] = kept
+            if found is not None:
+                self.pruned += 1
+                return found
+        return None
+
+
+class NonogramSearch:
+    def __init__(self, row_clues, col_clues, propagation=True, node_limit=None, time_limit=None,
+                 backjumping=False, nogood_capacity=10000, assumptions=(), path=(), line_cache=LINE_CACHE):
+        self.row_clues = row_clues
+        self.col_clues = col_clues
+        self.height = len(row_clues)
+        self.width = len(col_clues)
+        self.propagation = propagation
+        self.node_limit = node_limit
+        self.time_limit = time_limit
+        self.backjumping = backjumping
+        self.assumptions = list(assumptions)
+        self.path = list(path)
+
+        self.cells = bytearray([UNKNOWN]) * (self.width * self.height)
+        # LineCache de los resultados de solve_line (por omision el compartido del proceso)
+        self.line_cache = line_cache if propagation else None
+        self.trail = []
+        self.row_states = [LineState(clue, self.width) for clue in row_clues]
+        self.col_states = [LineState(clue, self.height) for clue in col_clues]
+        self.fed = 0
+        self.stack = []
+
+        # Razones por celda (mascaras de niveles de decision) y nogoods, solo con backjumping
+        self.reasons = LineReasons(self.width * self.height) if backjumping else None
+        self.nogoods = NogoodStore(nogood_capacity) if backjumping else None
+        self.backjump_count = 0
+        self._prefix_reasons = None
+        if backjumping and not propagation:
+            # Sin propagacion cada celda es una decision y su nivel es index + 1: la razon de un fallo
+            # en index son las celdas de su fila hasta ella y las de su columna hasta ella
+            width = self.width
+            row_prefix = [0] * len(self.cells)
+            col_prefix = [0] * len(self.cells)
+            for index in range(len(self.cells)):
+                bit = 1 << (index + 1)
+                row_prefix[index] = bit | (row_prefix[index - 1] if index % width else 0)
+                col_prefix[index] = bit | (col_prefix[index - width] if index >= width else 0)
+            self._prefix_reasons = [row | col for row, col in zip(row_prefix, col_prefix)]
+
+        self.status = None
+        self.node_count = 0
+        self.backtrack_count = 0
+        self.elapsed = 0.0
+        self._started = False
+        self._pause_requested = False
+
+    @property
+    def nodes_per_second(self):
+        return self.node_count / self.elapsed if self.elapsed > 0 else 0.0
+
+    def pause(self):
+        # Se puede llamar desde otro hilo o desde un callback; run() se detiene en el siguiente nodo
+        self._pause_requested = True
+
+    def grid(self):
+        return [list(self.cells[row * self.width:(row + 1) * self.width]) for row in range(self.height)]
+
+    def _feed(self):
+        # Pasar a los estados de linea las celdas conocidas hasta la primera desconocida
+        cells, width = self.cells, self.width
+        stop = cells.find(UNKNOWN, self.fed)
+        if stop == -1:
+            stop = len(cells)
+        while self.fed < stop:
+            index = self.fed
+            value = cells[index]
+            row_state, col_state = self.row_states[index // width], self.col_states[index % width]
+            if not (row_state.can_assign(value) and col_state.can_assign(value)):
+                return False
+            row_state.assign(value)
+            col_state.assign(value)
+            self.fed += 1
+        return True
+
+    def _line_reason(self, line):
+        cells, reasons = self.cells, self.reasons
+        reason = 0
+        for index in self._line_cells(line):
+            if cells[index] != UNKNOWN:
+                reason |= reasons[index]
+        return reason
+
+    def _cell_reason(self, index):
+        # Los chequeos de LineState dependen de todo lo conocido en la fila y la columna de la celda
+        if self.reasons is None:
+            return 0
+        if self._prefix_reasons is not None:
+            return self._prefix_reasons[index]
+        return self._line_reason(index // self.width) | self._line_reason(self.height + index % self.width)
+
+    def _line_cells(self, line):
+        if line < self.height:
+            return range(line * self.width, (line + 1) * self.width)
+        return range(line - self.height, self.width * self.height, self.width)
+
+    def _restore(self, mark, fed):
+        cells, trail, width = self.cells, self.trail, self.width
+        while len(trail) > mark:
+            cells[trail.pop()] = UNKNOWN
+        while self.fed > fed:
+            self.fed -= 1
+            self.row_states[self.fed // width].unassign()
+            self.col_states[self.fed % width].unassign()
+
+    def _try(self, index, value, mark, level):
+        # Fijar index = value y propagar; devuelve None si sigue consistente o la razon del fallo
+        cells, trail, width = self.cells, self.trail, self.width
+        if not (self.row_states[index // width].can_assign(value) and self.col_states[index % width].can_assign(value)):
+            return self._cell_reason(index) | 1 << level
+        cells[index] = value
+        trail.append(index)
+        if self.reasons is not None:
+            self.reasons[index] = 1 << level
+
+        conflict = None
+        if self.propagation:
+            conflict = explain_propagate(cells, width, self.height, self.row_clues, self.col_clues, [index // width], [index % width], trail, self.reasons, self.line_cache)
+        if conflict is not None:
+            return conflict
+
+        if self.nogoods is not None:
+            literals = self.nogoods.violated(cells, trail[mark:])
+            if literals is not None:
+                conflict = 0
+                for cell, _ in literals:
+                    conflict |= self.reasons[cell]
+                return conflict
+        if not self._feed():
+            return self._cell_reason(self.fed)
+        return None
+
+    def _backjump(self, conflict):
+        # Volver al nivel mas alto del conflicto; los niveles de en medio no influyeron en el fallo
+        stack = self.stack
+        if not conflict:
+            stack.clear()
+            return
+        if conflict.bit_count() <= self.nogoods.max_size:
+            literals = []
+            remaining = conflict
+            while remaining:
+                level = remaining.bit_length() - 1
+                remaining ^= 1 << level
+                literals.append((stack[level - 1][0], stack[level - 1][1] - 1))
+            self.nogoods.add(literals)
+        target = conflict.bit_length() - 1
+        if len(stack) - target > 1:
+            self.backjump_count += 1
+        del stack[target:]
+        stack[-1][4] |= conflict
+
+    def _descend(self):
+        # Probar el siguiente valor del nodo de arriba; si se agoto, volver al anterior
+        while self.stack:
+            frame = self.stack[-1]
+            index, value, mark, fed, conflict = frame
+            level = len(self.stack)
+            self._restore(mark, fed)
+            if value > 1:
+                self.stack.pop()
+                if self.backjumping:
+                    self._backjump(conflict & ~(1 << level))
+                continue
+            frame[1] = value + 1
+
+            failure = self._try(index, value, mark, level)
+            if failure is None:
+                return True
+            self.backtrack_count += 1
+            if self.backjumping:
+                frame[4] |= failure
+                if not failure >> level & 1:
+                    # El fallo no depende de este nodo: el otro valor fallaria igual
+                    frame[1] = 2
+        return False
+
+    def open_path(self):
+        """
+        Decisiones del camino actual como (celda, valor, abierta): abierta si el valor es 0 y falta
+        probar el 1. Con assumptions describe lo que le falta a la busqueda despues de una pausa o
+        de un limite: los subarboles de las alternativas abiertas y el del camino completo.
+        """
+        return [(frame[0], self.cells[frame[0]], frame[1] == 1) for frame in self.stack]
+
+    def _start(self):
+        self._started = True
+        cells = self.cells
+        for index, value in self.assumptions:
+            if cells[index] != UNKNOWN:
+                if cells[index] != value:
+                    return False
+                continue
+            cells[index] = value
+            self.trail.append(index)
+        consistent = not self.propagation or explain_propagate(cells, self.width, self.height, self.row_clues, self.col_clues, changed=self.trail, reasons=self.reasons, cache=self.line_cache) is None
+        if consistent:
+            consistent = self._feed()
+        return consistent and self._replay()
+
+    def _replay(self):
+        # Rehacer las decisiones de un camino exportado con open_path, con sus nodos en la pila
+        for index, value, is_open in self.path:
+            level = len(self.stack) + 1
+            mark = len(self.trail)
+            # Las razones de los valores ya probados se perdieron: el conflicto del nodo incluye
+            # todos los niveles anteriores, asi que solo se vuelve de a un nivel
+            frame = [index, 1 if is_open else 2, mark, self.fed, 0 if is_open else (1 << level) - 2]
+            self.stack.append(frame)
+            if self._try(index, value, mark, level) is not None:
+                return False
+        self.path = []
+        return True
+
+    def _solved(self):
+        return self.fed == len(self.cells)
+
+    def run(self):
+        start_time = time.perf_counter()
+        self._pause_requested = False
+        try:
+            if not self._started and not self._start():
+                self.status = 'unsat'
+                return self.status
+
+            while True:
+                if self._solved():
+                    self.status = 'solved'
+                    break
+                if self._pause_requested:
+                    self.status = 'paused'
+                    break
+                if self.node_limit is not None and self.node_count >= self.node_limit:
+                    self.status = 'limit'
+                    break
+                if self.time_limit is not None and self.elapsed + time.perf_counter() - start_time > self.time_limit:
+                    self.status = 'limit'
+                    break
+
+                self.node_count += 1
+                index = self.fed
+                self.stack.append([index, 0, len(self.trail), self.fed, 0])
+                if not self._descend():
+                    self.status = 'unsat'
+                    break
+            return self.status
+        finally:
+            self.elapsed += time.perf_counter() - start_time
+
+    def count_solutions(self, limit=2):
+        """
+        Sigue buscando despues de cada solucion hasta encontrar limit o agotar el arbol; con
+        limit=2 dice si la solucion es unica. Devuelve 'exhausted' si se recorrio todo (las
+        soluciones encontradas son todas), 'enough' si se llego a limit o 'limit' si se acabaron
+        los nodos o el tiempo. Las soluciones quedan en self.solutions.
+        """
+        if self.backjumping:
+            # Un salto puede pasar por encima de un nodo con soluciones en el otro valor
+            raise ValueError("count_solutions no funciona con backjumping=True")
+        self.solutions = []
+        # Con limit=0 no se busca: ya se llego al limite
+        while len(self.solutions) < limit:
+            if self.solutions and not self._descend():
+                # Tratar la solucion anterior como un fallo para seguir con la siguiente alternativa
+                return 'exhausted'
+            status = self.run()
+            if status != 'solved':
+                return 'exhausted' if status == 'unsat' else status
+            self.solutions.append(self.grid())
+        return 'enough'
+
+
+""" Motores disponibles para los scripts de lote y de benchmark, con la misma firma """
+
+
+def run_search(row_clues, col_clues, propagation, node_limit=None, time_limit=None, backjumping=False):
+    search = NonogramSearch(row_clues, col_clues, propagation, node_limit, time_limit, backjumping)
+    status = search.run()
+    grid = search.grid() if status == 'solved' else None
+    return status, grid, search.node_count, search.backtrack_count
+
+
+def run_basic(row_clues, col_clues, node_limit=None, time_limit=None):
+    return run_search(row_clues, col_clues, False, node_limit, time_limit)
+
+
+def run_basic_cbj(row_clues, col_clues, node_limit=None, time_limit=None):
+    return run_search(row_clues, col_clues, False, node_limit, time_limit, backjumping=True)
+
+
+def run_improved(row_clues, col_clues, node_limit=None, time_limit=None):
+    return run_search(row_clues, col_clues, True, node_limit, time_limit)
+
+
+def run_improved_cbj(row_clues, col_clues, node_limit=None, time_limit=None):
+    return run_search(row_clues, col_clues, True, node_limit, time_limit, backjumping=True)
+
+
+def run_patterns(row_clues, col_clues, node_limit=None, time_limit=None):
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    domains = LineDomains(row_clues, col_clues)
+    if not domains.propagate():
+        return 'unsat', None, 0, 0
+    result, node_count, backtrack_count = search(domains, 0, 0, node_limit, deadline)
+    if result is None:
+        return 'unsat', None, node_count, backtrack_count
+    if result is LIMIT:
+        return 'limit', None, node_count, backtrack_count
+    return 'solved', result.grid(), node_count, backtrack_count
+
+
+def run_numpy(row_clues, col_clues, node_limit=None, time_limit=None):
+    # La propagacion vectorizada necesita NumPy; se importa solo si se usa este motor (en un
+    # proceso nuevo el import, unos 80 ms, cuenta en el tiempo de la primera llamada)
+    from nonogram_numpy import solve_grid
+    return solve_grid(row_clues, col_clues, node_limit, time_limit)
+
+
+ENGINES = {
+    'basic': run_basic,
+    'basic-cbj': run_basic_cbj,
+    'improved': run_improved,
+    'improved-cbj': run_improved_cbj,
+    'numpy': run_numpy,
+    'patterns': run_patterns,
+}
@@ -0,0 +1,45 @@
+import argparse
+import time
+from uav_bounds import solution_gap
+from uav_exact import solve_branch_and_bound
+from uav_model import landing_times, read_instance
+from uav_plot import plot_schedule
+
+""" 
+Branch and bound para probar el optimo de instancias pequeñas y medianas (p. ej. t2_Titan.txt).
+Parte desde la solucion greedy y solo explora ordenes factibles; con --node-limit o --time-limit
+entrega la mejor solucion encontrada y su gap respecto a la cota inferior.
+"""
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Optimizar el orden de aterrizaje de UAVs de forma exacta.")
+    parser.add_argument("file_path", type=str, help="Ruta del archivo de datos de los UAVs")
+    parser.add_argument("--node-limit", type=int, default=None, help="Maximo de nodos a explorar")
+    parser.add_argument("--time-limit", type=float, default=None, help="Maximo de segundos de busqueda")
+    parser.add_argument("--output", type=str, default=None, help="Guardar el grafico en este archivo")
+    args = parser.parse_args()
+
+    instance = read_instance(args.file_path)
+
+    start_time = time.time()
+    result = solve_branch_and_bound(instance, node_limit=args.node_limit, time_limit=args.time_limit)
+    end_time = time.time()
+    print(f"Tiempo de ejecucion: {end_time - start_time:.4f} segundos")
+
+    print("Costo total:", result.cost)
+    print("Orden de aterrizaje:", result.order)
+    print(f"Nodos explorados: {result.nodes}")
+    if result.proven:
+        print("Optimo probado")
+    else:
+        bound, gap = solution_gap(instance, result.order, result.cost)
+        print(f"Limite alcanzado. Cota inferior: {bound}, Gap: {gap:.2%}")
+
+    if args.output:
+        times = landing_times(instance, result.order)
+        orden = [0] * instance.n
+        asignado = [0] * instance.n
+        for position, i in enumerate(result.order):
+            orden[i] = position
+            asignado[i] = times[position]
+        plot_schedule(instance.menor, instance.ideal, instance.maximo, asignado, orden, output=args.output)
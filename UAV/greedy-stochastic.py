@@ -1,7 +1,9 @@
 import argparse
 import numpy as np
-import matplotlib.pyplot as plt
 import time 
+from uav_bounds import lower_bound, optimality_gap, solution_gap
+from uav_model import instance_from_uav_data, is_feasible
+from uav_plot import plot_schedule
 
 class UAVManager:
     def __init__(self, file_path, seed):
@@ -55,6 +57,7 @@ class UAVManager:
         # Inicializar variables
         self.total_cost = 0
         time = 0
+        previous_uav = None
 
         # Iterar sobre los UAVs
         for i in range(len(self.uav_data)):
@@ -69,6 +72,10 @@ class UAVManager:
             idx = rng.choice(range(k), p=probabilities)
             selected_uav = sorted_uav_data.pop(idx)
 
+            # El UAV seleccionado debe respetar la separacion con el que aterrizo antes
+            if previous_uav is not None:
+                time = previous_uav['tiempo_aterrizaje_asignado'] + previous_uav['tiempos_aterrizaje'][selected_uav['index']]
+
             # Encontrar el tiempo de aterrizaje más cercano al tiempo ideal sin violar los límites de tiempo mínimo y máximo
             closest_time = max(selected_uav['tiempo_aterrizaje_menor'], min(selected_uav['tiempo_aterrizaje_maximo'], max(time, selected_uav['tiempo_aterrizaje_ideal'])))
 
@@ -81,7 +88,7 @@ class UAVManager:
 
             # Actualizar el costo total y el tiempo actual
             self.total_cost += penalty
-            time = closest_time + selected_uav['tiempos_aterrizaje'][i]
+            previous_uav = selected_uav
 
             # Asignar el orden de aterrizaje
             selected_uav['orden'] = i
@@ -91,30 +98,18 @@ class UAVManager:
         print("Costo total:", self.total_cost)
         sorted_uav_data = sorted(self.uav_data, key=lambda uav: uav['orden'])
         print("Orden de aterrizaje:", [uav['index'] for uav in sorted_uav_data])
-
-    def plot_schedule(self):
-        fig, ax = plt.subplots()
-
-        for uav in self.uav_data:
-            y = uav['orden']
-            
-            # Dibujar puntos en el tiempo minimo, tiempo ideal, tiempo maximo y tiempo de aterrizaje asignado
-            ax.plot(uav['tiempo_aterrizaje_menor'], y, marker='o', markersize=6, color='red')
-            ax.plot(uav['tiempo_aterrizaje_ideal'], y, marker='o', markersize=6, color='green')
-            ax.plot(uav['tiempo_aterrizaje_maximo'], y, marker='o', markersize=6, color='blue')
-            ax.plot(uav['tiempo_aterrizaje_asignado'], y, marker='o', markersize=8, color='black')
-            
-            # Mostrar los valores del tiempo minimo, tiempo ideal, tiempo maximo y tiempo de aterrizaje asignado
-            ax.text(uav['tiempo_aterrizaje_menor'], y, f"{uav['tiempo_aterrizaje_menor']:.1f}", ha='right', va='bottom', color='red')
-            ax.text(uav['tiempo_aterrizaje_ideal'], y, f"{uav['tiempo_aterrizaje_ideal']:.1f}", ha='right', va='bottom', color='green')
-            ax.text(uav['tiempo_aterrizaje_maximo'], y, f"{uav['tiempo_aterrizaje_maximo']:.1f}", ha='left', va='bottom', color='blue')
-            ax.text(uav['tiempo_aterrizaje_asignado'], y, f"{uav['tiempo_aterrizaje_asignado']:.1f}", ha='left', va='bottom', color='black')
-
-        ax.set_xlabel('Tiempo')
-        ax.set_ylabel('Orden de aterrizaje')
-        ax.set_title('Programacion de aterrizaje de UAVs')
-        plt.tight_layout()
-        plt.show()
+        bound, gap = solution_gap(instance_from_uav_data(self.uav_data), [uav['index'] for uav in sorted_uav_data], self.total_cost)
+        print(f"Cota inferior: {bound}, Gap: {gap:.2%}")
+
+    def plot_schedule(self, output=None):
+        plot_schedule(
+            [uav['tiempo_aterrizaje_menor'] for uav in self.uav_data],
+            [uav['tiempo_aterrizaje_ideal'] for uav in self.uav_data],
+            [uav['tiempo_aterrizaje_maximo'] for uav in self.uav_data],
+            [uav['tiempo_aterrizaje_asignado'] for uav in self.uav_data],
+            [uav['orden'] for uav in self.uav_data],
+            output=output,
+        )
 
     def test_rng(self):
         rng = np.random.default_rng(self.seed)
@@ -128,6 +123,8 @@ if __name__ == "__main__":
     """ Quiero un flag booleano que permita explorar distintas semillas para encontrar la mejor solución. """
     parser.add_argument("--explore", action="store_true", help="Explorar distintas semillas para encontrar la mejor solucion")
     parser.add_argument("--range", type=int, default=1000, help="Rango de semillas a explorar")
+    parser.add_argument("--output", type=str, default=None, help="Guardar el grafico en este archivo en vez de mostrarlo")
+    parser.add_argument("--gap", type=float, default=None, help="Detenerse al encontrar una solucion con este gap respecto a la cota inferior (p. ej. 0.01)")
     args = parser.parse_args()
 
     """  
@@ -141,6 +138,7 @@ if __name__ == "__main__":
 
         seeds = range(args.range)
         results = []
+        instance = None
 
         for seed in seeds:
             uav_manager = UAVManager(args.file_path, seed)
@@ -150,11 +148,21 @@ if __name__ == "__main__":
                 'uav_data': uav_manager.uav_data
             })
 
+            # Si la solucion ya esta dentro del gap pedido no vale la pena seguir probando semillas
+            if args.gap is not None:
+                if instance is None:
+                    instance = instance_from_uav_data(uav_manager.uav_data)
+                    bound = lower_bound(instance)
+                order = [uav['index'] for uav in sorted(uav_manager.uav_data, key=lambda uav: uav['orden'])]
+                if is_feasible(instance, order) and optimality_gap(uav_manager.total_cost, bound) <= args.gap:
+                    print(f"Semilla {seed} dentro del gap {args.gap:.2%} (cota inferior {bound})")
+                    break
+
 
         sorted_results = sorted(results, key=lambda x: x['total_cost'])
         # Muestra las 5 semillas que generaron los costos totales más bajos
-        for i in range(5):
-            print(f"Semilla: {sorted_results[i]['seed']}, Costo total: {sorted_results[i]['total_cost']}")
+        for result in sorted_results[:5]:
+            print(f"Semilla: {result['seed']}, Costo total: {result['total_cost']}")
 
         # También puedes seleccionar y mostrar otras semillas de interés
         # Por ejemplo, podrías mostrar la semilla que generó el costo total más alto
@@ -167,9 +175,9 @@ if __name__ == "__main__":
 
         """
         Spoilers (rango 0 al 5000):
-            - Titan.txt: La mejor semilla es 291 con un costo total de 165.0
-            - Deimos.txt: La mejor semilla es 3556 con un costo total de 14190.0
-            - Europa.txt La mejor semilla es 1072 con un costo total de 2547.0
+            - Titan.txt: La mejor semilla es 1959 con un costo total de 77.0
+            - Deimos.txt: La mejor semilla es 3556 con un costo total de 14946.0
+            - Europa.txt La mejor semilla es 1072 con un costo total de 1920.0 (orden infactible)
         """
 
     else:
@@ -178,4 +186,4 @@ if __name__ == "__main__":
         end_time = time.time()
         print(f"Tiempo de ejecucion: {end_time - start_time:.4f} segundos")
         uav_manager.display_data()
-        uav_manager.plot_schedule()
+        uav_manager.plot_schedule(args.output)
@@ -1,6 +1,8 @@
 import argparse
-import matplotlib.pyplot as plt
 import time
+from uav_bounds import solution_gap
+from uav_model import instance_from_uav_data
+from uav_plot import plot_schedule
 
 class UAVManager:
     def __init__(self, file_path):
@@ -65,7 +67,8 @@ class UAVManager:
 
             # Actualizar el costo total y el tiempo actual
             self.total_cost += penalty
-            time = closest_time + uav['tiempos_aterrizaje'][i]
+            if i + 1 < len(sorted_uav_data):
+                time = closest_time + uav['tiempos_aterrizaje'][sorted_uav_data[i + 1]['index']]
 
             # Asignar el orden de aterrizaje
             uav['orden'] = i
@@ -74,6 +77,8 @@ class UAVManager:
         print("Costo total:", self.total_cost)
         sorted_uav_data = sorted(self.uav_data, key=lambda uav: uav['orden'])
         print("Orden de aterrizaje:", [uav['index'] for uav in sorted_uav_data])
+        bound, gap = solution_gap(instance_from_uav_data(self.uav_data), [uav['index'] for uav in sorted_uav_data], self.total_cost)
+        print(f"Cota inferior: {bound}, Gap: {gap:.2%}")
         
     def display_initial_solution(self):
         print("Solución inicial:")
@@ -81,33 +86,20 @@ class UAVManager:
             print(f"UAV {uav['orden']}: Tiempo de aterrizaje asignado: {uav['tiempo_aterrizaje_asignado']}")
         print("Costo total inicial:", self.total_cost)
 
-    def plot_schedule(self):
-        fig, ax = plt.subplots()
-
-        for uav in self.uav_data:
-            y = uav['orden']
-            
-            # Dibujar puntos en el tiempo minimo, tiempo ideal, tiempo maximo y tiempo de aterrizaje asignado
-            ax.plot(uav['tiempo_aterrizaje_menor'], y, marker='o', markersize=6, color='red')
-            ax.plot(uav['tiempo_aterrizaje_ideal'], y, marker='o', markersize=6, color='green')
-            ax.plot(uav['tiempo_aterrizaje_maximo'], y, marker='o', markersize=6, color='blue')
-            ax.plot(uav['tiempo_aterrizaje_asignado'], y, marker='o', markersize=8, color='black')
-            
-            # Mostrar los valores del tiempo minimo, tiempo ideal, tiempo maximo y tiempo de aterrizaje asignado
-            ax.text(uav['tiempo_aterrizaje_menor'], y, f"{uav['tiempo_aterrizaje_menor']:.1f}", ha='right', va='bottom', color='red')
-            ax.text(uav['tiempo_aterrizaje_ideal'], y, f"{uav['tiempo_aterrizaje_ideal']:.1f}", ha='right', va='bottom', color='green')
-            ax.text(uav['tiempo_aterrizaje_maximo'], y, f"{uav['tiempo_aterrizaje_maximo']:.1f}", ha='left', va='bottom', color='blue')
-            ax.text(uav['tiempo_aterrizaje_asignado'], y, f"{uav['tiempo_aterrizaje_asignado']:.1f}", ha='left', va='bottom', color='black')
-
-        ax.set_xlabel('Tiempo')
-        ax.set_ylabel('Orden de aterrizaje')
-        ax.set_title('Programacion de aterrizaje de UAVs')
-        plt.tight_layout()
-        plt.show()
+    def plot_schedule(self, output=None):
+        plot_schedule(
+            [uav['tiempo_aterrizaje_menor'] for uav in self.uav_data],
+            [uav['tiempo_aterrizaje_ideal'] for uav in self.uav_data],
+            [uav['tiempo_aterrizaje_maximo'] for uav in self.uav_data],
+            [uav['tiempo_aterrizaje_asignado'] for uav in self.uav_data],
+            [uav['orden'] for uav in self.uav_data],
+            output=output,
+        )
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Optimizar el orden de aterrizaje de UAVs.")
     parser.add_argument("file_path", type=str, help="Ruta del archivo de datos de los UAVs")
+    parser.add_argument("--output", type=str, default=None, help="Guardar el grafico en este archivo en vez de mostrarlo")
     args = parser.parse_args()
 
     start_time = time.time()
@@ -116,4 +108,4 @@ if __name__ == "__main__":
     print(f"Tiempo de ejecución completa: {end_time - start_time:.4f} segundos")
 
     uav_manager.display_data()
-    uav_manager.plot_schedule()
+    uav_manager.plot_schedule(args.output)
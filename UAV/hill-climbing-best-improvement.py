@@ -1,7 +1,11 @@
 import argparse
-import matplotlib.pyplot as plt
 import time
 import numpy as np
+from uav_bounds import lower_bound, solution_gap, target_cost
+from uav_model import Schedule, instance_from_uav_data
+from uav_plot import plot_schedule
+from uav_preprocess import preprocess
+from uav_solvers import solve_hill_climbing, solve_steepest_descent
 
 class UAVManager:
     def __init__(self, file_path, seed):
@@ -9,6 +13,7 @@ class UAVManager:
         self.uav_data = []
         self.total_cost = 0
         self.read_file()
+        self.instance = instance_from_uav_data(self.uav_data)
         self.seed = seed
 
     """ utils """
@@ -39,17 +44,12 @@ class UAVManager:
                 uav['tiempos_aterrizaje'] = tiempos_aterrizaje
                 self.uav_data.append(uav)
 
-    def get_random_neighbor(self, order):
-        neighbor = order[:]
-        # this line to np i, j = random.sample(range(len(neighbor)), 2)
-        i, j = np.random.choice(len(neighbor), 2, replace=False)
-        neighbor[i], neighbor[j] = neighbor[j], neighbor[i]
-        return neighbor
-    
     def display_data(self):
         print("Costo total:", self.total_cost)
         sorted_uav_data = sorted(self.uav_data, key=lambda uav: uav['orden'])
         print("Orden de aterrizaje:", [uav['index'] for uav in sorted_uav_data])
+        bound, gap = solution_gap(self.instance, [uav['index'] for uav in sorted_uav_data], self.total_cost)
+        print(f"Cota inferior: {bound}, Gap: {gap:.2%}")
         
     def display_initial_solution(self):
         print("Solución inicial:")
@@ -57,40 +57,15 @@ class UAVManager:
             print(f"UAV {uav['orden']}: Tiempo de aterrizaje asignado: {uav['tiempo_aterrizaje_asignado']}")
         print("Costo total inicial:", self.total_cost)
 
-    def plot_schedule(self):
-        fig, ax = plt.subplots()
-
-        for uav in self.uav_data:
-            y = uav['orden']
-            
-            # Dibujar puntos en el tiempo minimo, tiempo ideal, tiempo maximo y tiempo de aterrizaje asignado
-            ax.plot(uav['tiempo_aterrizaje_menor'], y, marker='o', markersize=6, color='red')
-            ax.plot(uav['tiempo_aterrizaje_ideal'], y, marker='o', markersize=6, color='green')
-            ax.plot(uav['tiempo_aterrizaje_maximo'], y, marker='o', markersize=6, color='blue')
-            ax.plot(uav['tiempo_aterrizaje_asignado'], y, marker='o', markersize=8, color='black')
-            
-            # Mostrar los valores del tiempo minimo, tiempo ideal, tiempo maximo y tiempo de aterrizaje asignado
-            ax.text(uav['tiempo_aterrizaje_menor'], y, f"{uav['tiempo_aterrizaje_menor']:.1f}", ha='right', va='bottom', color='red')
-            ax.text(uav['tiempo_aterrizaje_ideal'], y, f"{uav['tiempo_aterrizaje_ideal']:.1f}", ha='right', va='bottom', color='green')
-            ax.text(uav['tiempo_aterrizaje_maximo'], y, f"{uav['tiempo_aterrizaje_maximo']:.1f}", ha='left', va='bottom', color='blue')
-            ax.text(uav['tiempo_aterrizaje_asignado'], y, f"{uav['tiempo_aterrizaje_asignado']:.1f}", ha='left', va='bottom', color='black')
-
-        ax.set_xlabel('Tiempo')
-        ax.set_ylabel('Orden de aterrizaje')
-        ax.set_title('Programacion de aterrizaje de UAVs')
-        plt.tight_layout()
-        plt.show()
-
-    def calculate_cost(self, order):
-        total_cost = 0
-        time = 0
-        for i in order:
-            uav = self.uav_data[i]
-            closest_time = max(uav['tiempo_aterrizaje_menor'], min(uav['tiempo_aterrizaje_maximo'], max(time, uav['tiempo_aterrizaje_ideal'])))
-            penalty = abs(closest_time - uav['tiempo_aterrizaje_ideal'])
-            total_cost += penalty
-            time = closest_time + uav['tiempos_aterrizaje'][i]
-        return total_cost
+    def plot_schedule(self, output=None):
+        plot_schedule(
+            [uav['tiempo_aterrizaje_menor'] for uav in self.uav_data],
+            [uav['tiempo_aterrizaje_ideal'] for uav in self.uav_data],
+            [uav['tiempo_aterrizaje_maximo'] for uav in self.uav_data],
+            [uav['tiempo_aterrizaje_asignado'] for uav in self.uav_data],
+            [uav['orden'] for uav in self.uav_data],
+            output=output,
+        )
 
     def get_all_neighbors(self, order):
         neighbors = []
@@ -127,7 +102,8 @@ class UAVManager:
 
             # Actualizar el costo total y el tiempo actual
             self.total_cost += penalty
-            time = closest_time + uav['tiempos_aterrizaje'][i]
+            if i + 1 < len(sorted_uav_data):
+                time = closest_time + uav['tiempos_aterrizaje'][sorted_uav_data[i + 1]['index']]
 
             # Asignar el orden de aterrizaje
             uav['orden'] = i
@@ -142,6 +118,7 @@ class UAVManager:
         # Inicializar variables
         self.total_cost = 0
         time = 0
+        previous_uav = None
 
         # Iterar sobre los UAVs
         for i in range(len(self.uav_data)):
@@ -156,6 +133,10 @@ class UAVManager:
             idx = rng.choice(range(k), p=probabilities)
             selected_uav = sorted_uav_data.pop(idx)
 
+            # El UAV seleccionado debe respetar la separacion con el que aterrizo antes
+            if previous_uav is not None:
+                time = previous_uav['tiempo_aterrizaje_asignado'] + previous_uav['tiempos_aterrizaje'][selected_uav['index']]
+
             # Encontrar el tiempo de aterrizaje más cercano al tiempo ideal sin violar los límites de tiempo mínimo y máximo
             closest_time = max(selected_uav['tiempo_aterrizaje_menor'], min(selected_uav['tiempo_aterrizaje_maximo'], max(time, selected_uav['tiempo_aterrizaje_ideal'])))
 
@@ -168,82 +149,38 @@ class UAVManager:
 
             # Actualizar el costo total y el tiempo actual
             self.total_cost += penalty
-            time = closest_time + selected_uav['tiempos_aterrizaje'][i]
+            previous_uav = selected_uav
 
             # Asignar el orden de aterrizaje
             selected_uav['orden'] = i
 
-    def is_feasible(self, order):
-        time = 0
-        for i in order:
-            uav = self.uav_data[i]
-            closest_time = max(uav['tiempo_aterrizaje_menor'], min(uav['tiempo_aterrizaje_maximo'], max(time, uav['tiempo_aterrizaje_ideal'])))
-            if closest_time < uav['tiempo_aterrizaje_menor'] or closest_time > uav['tiempo_aterrizaje_maximo']:
-                return False
-            time = closest_time + uav['tiempos_aterrizaje'][i]
-        return True
-
-    def solve_hill_climbing(self, max_iterations=1000, max_no_improvement=100, max_attempts=10):
-        current_order = [uav['orden'] for uav in self.uav_data]
-        current_cost = self.total_cost
-
-        best_order = current_order[:]
-        best_cost = current_cost
-
-        no_improvement_counter = 0
-
-        for iteration in range(max_iterations):
-            if no_improvement_counter >= max_no_improvement:
-                break
-
-            best_neighbor_order = None
-            best_neighbor_cost = float('inf')
-
-            # Generar y evaluar todas las soluciones vecinas
-            for _ in range(max_attempts):
-                neighbor_order = self.get_random_neighbor(current_order)
-                if not self.is_feasible(neighbor_order):
-                    continue
-
-                neighbor_cost = self.calculate_cost(neighbor_order)
-
-                # Si esta solución vecina es la mejor hasta ahora, recordarla
-                if neighbor_cost < best_neighbor_cost:
-                    best_neighbor_order = neighbor_order
-                    best_neighbor_cost = neighbor_cost
-
-            # Si no se encontró ninguna solución vecina factible, incrementar el contador de no mejora
-            if best_neighbor_order is None:
-                no_improvement_counter += 1
-                continue
-
-            # Si la mejor solución vecina es mejor que la solución actual, adoptarla
-            if best_neighbor_cost < current_cost:
-                current_order = best_neighbor_order
-                current_cost = best_neighbor_cost
-                no_improvement_counter = 0
-
-                if current_cost < best_cost:
-                    best_order = current_order[:]
-                    best_cost = current_cost
-            else:
-                no_improvement_counter += 1
-
-            for i, uav in enumerate(self.uav_data):
-                uav_index = best_order.index(i)
-                uav['orden'] = uav_index
-
-                closest_time = max(uav['tiempo_aterrizaje_menor'],
-                                min(uav['tiempo_aterrizaje_maximo'],
-                                    max(uav['tiempos_aterrizaje'][uav_index], uav['tiempo_aterrizaje_ideal'])))
-                uav['tiempo_aterrizaje_asignado'] = closest_time
-                uav['penalizacion'] = abs(closest_time - uav['tiempo_aterrizaje_ideal'])
-
-            # Actualizar el costo total
-            self.total_cost = best_cost
-
-    def run_hill_climbing(self, max_iterations=1000, max_no_improvement=100):
-        self.solve_hill_climbing(max_iterations=max_iterations, max_no_improvement=max_no_improvement)
+    def solve_hill_climbing(self, max_iterations=1000, max_no_improvement=100, max_attempts=10, target_cost=None):
+        # Best improvement entre max_attempts intercambios al azar; los vecinos se evaluan sobre un
+        # Schedule (uav_solvers.solve_hill_climbing), sin copiar el orden
+        current_order = [uav['index'] for uav in sorted(self.uav_data, key=lambda uav: uav['orden'])]
+        best_order, best_cost = solve_hill_climbing(self.instance, current_order, self.seed, neighborhood='swap',
+                                                    best_improvement=True, max_iterations=max_iterations,
+                                                    max_no_improvement=max_no_improvement, max_attempts=max_attempts,
+                                                    target_cost=target_cost, preprocessing=preprocess(self.instance))
+
+        # Escribir la mejor solucion en uav_data una sola vez, en O(n)
+        Schedule(self.instance, best_order).materialize(self.uav_data)
+        self.total_cost = best_cost
+
+    def solve_full_scan(self, neighborhood='swap', max_iterations=1000, target_cost=None):
+        # Todos los vecinos por iteracion, evaluados juntos con NumPy (uav_solvers.scan_moves)
+        current_order = [uav['index'] for uav in sorted(self.uav_data, key=lambda uav: uav['orden'])]
+        best_order, best_cost = solve_steepest_descent(self.instance, current_order, neighborhood, max_iterations,
+                                                       target_cost=target_cost, preprocessing=preprocess(self.instance))
+        Schedule(self.instance, best_order).materialize(self.uav_data)
+        self.total_cost = best_cost
+
+    def run_hill_climbing(self, max_iterations=1000, max_no_improvement=100, gap=None, full_scan=None):
+        goal = target_cost(lower_bound(self.instance), gap)
+        if full_scan is not None:
+            self.solve_full_scan(full_scan, max_iterations=max_iterations, target_cost=goal)
+        else:
+            self.solve_hill_climbing(max_iterations=max_iterations, max_no_improvement=max_no_improvement, target_cost=goal)
         self.display_data()
 
 
@@ -252,6 +189,8 @@ if __name__ == "__main__":
     parser.add_argument("file_path", type=str, help="Ruta del archivo de datos de los UAVs")
     parser.add_argument("--algorithm", type=str, default="greedy", help="Algoritmo a utilizar para resolver el problema [greedy, greedy-stochastic]")
     parser.add_argument("--seed", type=int, default=0, help="Semilla para el generador de numeros aleatorios")
+    parser.add_argument("--gap", type=float, default=None, help="Detenerse al encontrar una solucion con este gap respecto a la cota inferior (p. ej. 0.01)")
+    parser.add_argument("--full-scan", type=str, default=None, choices=["swap", "reversal"], help="Evaluar todos los intercambios o inversiones en cada iteracion en vez de max_attempts al azar")
     args = parser.parse_args()
 
 
@@ -272,4 +211,4 @@ if __name__ == "__main__":
 
     # hill climbing (best improvement)
     print("Algoritmo: Hill Climbing desde Greedy")
-    uav_manager.run_hill_climbing()
\ No newline at end of file
+    uav_manager.run_hill_climbing(gap=args.gap, full_scan=args.full_scan)
\ No newline at end of file
@@ -0,0 +1,248 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from uav_bounds import lower_bound, optimality_gap, target_cost
+from uav_model import evaluate, read_instance
+from uav_solvers import ALGORITHMS
+
+
+"""
+Servicio local que mantiene las instancias ya parseadas en memoria.
+
+Cada linea que llega por el socket es un JSON con una operacion:
+    {"op": "solve", "id": 1, "instance": "t2_Titan.txt", "algorithm": "hill-climbing-any", "seeds": [0, 1, 2], "budget": 1000}
+    {"op": "solve", "id": 2, "hash": "<sha256 del archivo>", "algorithm": "greedy", "seed": 0}
+    {"op": "solve", "id": 3, "instance": "t2_Titan.txt", "algorithm": "tabu", "seeds": [0, 1], "gap": 0.05}
+    {"op": "load", "instance": "t2_Titan.txt"}
+    {"op": "stats"}
+
+Las respuestas de un solve se envian como una linea JSON por semilla, a medida que terminan,
+y al final una linea {"id": ..., "done": true}; una semilla que falla se informa con
+{"id": ..., "error": "..."} y las demas siguen. Cada resultado incluye la cota inferior y el gap;
+con "gap" las busquedas se detienen al llegar a ese gap y las semillas pendientes se cancelan.
+Las instancias se guardan en un cache LRU por el hash de su contenido, asi que pedir de nuevo la
+misma instancia no vuelve a leer ni parsear el archivo.
+"""
+
+
+class InstanceCache:
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.instances = OrderedDict()
+        self.paths = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        instance = self.instances.get(key)
+        if instance is None:
+            self.misses += 1
+            return None
+        self.instances.move_to_end(key)
+        self.hits += 1
+        return instance
+
+    def put(self, instance):
+        self.instances[instance.content_hash] = instance
+        self.instances.move_to_end(instance.content_hash)
+        while len(self.instances) > self.maxsize:
+            self.instances.popitem(last=False)
+
+    def load(self, file_path):
+        # El hash de un archivo se recuerda mientras no cambie su tamaño ni su fecha de modificacion
+        stat = os.stat(file_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        known = self.paths.get(file_path)
+        if known is not None and known[0] == signature and known[1] in self.instances:
+            return self.get(known[1])
+
+        instance = read_instance(file_path)
+        self.misses += 1
+        self.paths[file_path] = (signature, instance.content_hash)
+        self.put(instance)
+        return instance
+
+    def stats(self):
+        return {'size': len(self.instances), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+""" Lado de los procesos del pool: cada proceso guarda sus propias instancias por hash """
+
+_worker_instances = OrderedDict()
+_worker_bounds = {}
+_WORKER_CACHE_SIZE = 8
+_MISSING = 'missing'
+
+
+def _solve_task(key, instance, algorithm, seed, budget, gap):
+    if instance is None:
+        instance = _worker_instances.get(key)
+        if instance is None:
+            return _MISSING
+    else:
+        _worker_instances[key] = instance
+        while len(_worker_instances) > _WORKER_CACHE_SIZE:
+            _worker_bounds.pop(_worker_instances.popitem(last=False)[0], None)
+    _worker_instances.move_to_end(key)
+    if key not in _worker_bounds:
+        _worker_bounds[key] = lower_bound(instance)
+    bound = _worker_bounds[key]
+
+    start_time = time.perf_counter()
+    order, cost = ALGORITHMS[algorithm](instance, seed, budget, target_cost(bound, gap))
+    feasible = evaluate(instance, order)[0] == 0
+    # Un costo infinito (sin orden factible) se envia como null: JSON no tiene Infinity
+    return {'seed': seed, 'cost': cost if math.isfinite(cost) else None, 'order': [int(i) for i in order], 'feasible': feasible,
+            'lower_bound': bound, 'gap': optimality_gap(cost, bound) if feasible else None,
+            'elapsed': time.perf_counter() - start_time}
+
+
+class SolverService:
+    def __init__(self, workers=None, cache_size=32):
+        self.cache = InstanceCache(cache_size)
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+
+    def resolve(self, request):
+        if 'hash' in request:
+            instance = self.cache.get(request['hash'])
+            if instance is None:
+                raise KeyError(f"Instancia desconocida: {request['hash']}")
+            return instance
+        return self.cache.load(request['instance'])
+
+    async def run_seed(self, instance, algorithm, seed, budget, gap):
+        loop = asyncio.get_running_loop()
+        # Primero se intenta sin enviar la instancia; si el proceso no la tiene se reenvia completa
+        result = await loop.run_in_executor(self.pool, _solve_task, instance.content_hash, None, algorithm, seed, budget, gap)
+        if result == _MISSING:
+            result = await loop.run_in_executor(self.pool, _solve_task, instance.content_hash, instance, algorithm, seed, budget, gap)
+        return result
+
+    async def solve(self, request, send):
+        instance = self.resolve(request)
+        algorithm = request.get('algorithm', 'greedy')
+        if algorithm not in ALGORITHMS:
+            raise KeyError(f"Algoritmo desconocido: {algorithm}")
+        seeds = request.get('seeds', [request.get('seed', 0)])
+        budget = request.get('budget')
+        gap = request.get('gap')
+
+        tasks = [asyncio.ensure_future(self.run_seed(instance, algorithm, seed, budget, gap)) for seed in seeds]
+        for task in asyncio.as_completed(tasks):
+            try:
+                result = await task
+            except asyncio.CancelledError:
+                continue
+            except Exception as error:
+                # Un error en una semilla (p. ej. una semilla invalida) se informa sin cortar las demas
+                await send({'id': request.get('id'), 'error': str(error)})
+                continue
+            result['id'] = request.get('id')
+            await send(result)
+            # Con una solucion dentro del gap no tiene sentido seguir con las demas semillas
+            if gap is not None and result['gap'] is not None and result['gap'] <= gap:
+                for pending in tasks:
+                    pending.cancel()
+        await send({'id': request.get('id'), 'hash': instance.content_hash, 'done': True})
+
+    async def handle(self, request, send):
+        op = request.get('op', 'solve')
+        try:
+            if op == 'solve':
+                await self.solve(request, send)
+            elif op == 'load':
+                instance = self.resolve(request)
+                await send({'id': request.get('id'), 'hash': instance.content_hash, 'n': instance.n})
+            elif op == 'stats':
+                await send({'id': request.get('id'), **self.cache.stats()})
+            else:
+                raise KeyError(f"Operacion desconocida: {op}")
+        except Exception as error:
+            await send({'id': request.get('id'), 'error': str(error)})
+            # El cliente de un solve espera siempre la linea final
+            if op == 'solve':
+                await send({'id': request.get('id'), 'done': True})
+
+    async def client_connected(self, reader, writer):
+        lock = asyncio.Lock()
+
+        async def send(message):
+            async with lock:
+                writer.write(json.dumps(message).encode() + b'\n')
+                await writer.drain()
+
+        pending = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError as error:
+                    await send({'error': str(error)})
+                    continue
+                if not isinstance(request, dict):
+                    await send({'error': f"La solicitud debe ser un objeto JSON, no {type(request).__name__}"})
+                    continue
+                # Cada solicitud se atiende por separado para que las respuestas se intercalen
+                task = asyncio.ensure_future(self.handle(request, send))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path=None, host='127.0.0.1', port=None):
+        if port is not None:
+            server = await asyncio.start_server(self.client_connected, host, port)
+        else:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            server = await asyncio.start_unix_server(self.client_connected, socket_path)
+        async with server:
+            await server.serve_forever()
+
+
+async def send_request(request, socket_path=None, host='127.0.0.1', port=None):
+    if port is not None:
+        reader, writer = await asyncio.open_connection(host, port)
+    else:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+    writer.write(json.dumps(request).encode() + b'\n')
+    await writer.drain()
+
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        message = json.loads(line)
+        print(json.dumps(message))
+        # Un solve termina siempre con done, aunque alguna semilla haya fallado
+        if message.get('done') or not isinstance(request, dict) or request.get('op', 'solve') != 'solve':
+            break
+    writer.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio local para resolver instancias de UAVs sin volver a parsearlas.")
+    parser.add_argument("--socket", type=str, default="/tmp/uav-solver.sock", help="Ruta del socket Unix")
+    parser.add_argument("--port", type=int, default=None, help="Usar TCP en localhost en este puerto en vez del socket Unix")
+    parser.add_argument("--workers", type=int, default=None, help="Cantidad de procesos del pool")
+    parser.add_argument("--cache-size", type=int, default=32, help="Cantidad de instancias en el cache LRU")
+    parser.add_argument("--request", type=str, default=None, help="Enviar esta solicitud JSON a un servicio ya iniciado e imprimir las respuestas")
+    args = parser.parse_args()
+
+    if args.request:
+        asyncio.run(send_request(json.loads(args.request), args.socket, port=args.port))
+    else:
+        service = SolverService(args.workers, args.cache_size)
+        print(f"Escuchando en {'127.0.0.1:' + str(args.port) if args.port is not None else args.socket}")
+        asyncio.run(service.serve(args.socket, port=args.port))
@@ -0,0 +1,299 @@
+import argparse
+import time as timer
+
+import numpy as np
+
+from uav_bounds import solution_gap
+from uav_model import evaluate, landing_times, read_instance
+from uav_preprocess import preprocess
+from uav_solvers import solve_greedy
+
+
+"""
+Adaptive large neighbourhood search (ALNS) sobre ordenes de aterrizaje.
+
+Cada iteracion saca un bloque de UAVs del orden actual (destroy) y los vuelve a insertar uno a
+uno (repair). Operadores de destruccion:
+
+- random: UAVs al azar.
+- related: UAVs con ventanas parecidas (menor, ideal y maximo cercanos) a un UAV semilla, que
+  son los que conviene reordenar entre si.
+- worst: UAVs con mayor penalizacion en el orden actual.
+
+Operadores de reparacion: greedy inserta primero el UAV cuya mejor insercion deja el menor
+(atraso, costo); regret inserta primero el que mas pierde si no va en su mejor posicion.
+
+Los dos evaluan en cada paso todas las posiciones de todos los UAVs pendientes de una vez
+(insertion_costs). Una insercion en p solo cambia los tiempos desde p, y como cada UAV aterriza
+en max(anterior + separacion, ideal) el cambio se suele absorber pocas posiciones despues: la
+simulacion avanza de a una posicion para todos los pares (uav, p) a la vez con NumPy y un par
+se termina apenas su tiempo coincide con el del orden sin insertar, sumando el resto del costo
+de los acumulados de ese orden. Con un preprocesamiento (uav_preprocess) solo se simulan las
+posiciones que respetan las precedencias forzadas.
+
+Los pesos de los operadores se ajustan cada segment_length iteraciones segun los puntajes que
+ganaron (nueva mejor, mejora de la actual, aceptada sin mejorar), y la aceptacion es de
+recocido simulado sobre el costo; con distinto atraso se acepta solo si el atraso baja.
+"""
+
+SCORE_BEST = 33
+SCORE_IMPROVED = 9
+SCORE_ACCEPTED = 13
+
+
+def _base_state(instance, order):
+    # Tiempos del orden parcial (recurrencia de calculate_cost) y costo y atraso acumulados antes de cada posicion
+    menor, ideal, maximo, separacion = instance.arrays()
+    order = np.asarray(order, dtype=np.int64)
+    times = np.asarray(landing_times(instance, order.tolist()), dtype=float)
+    costs = np.zeros(len(order) + 1)
+    np.cumsum(np.abs(times - ideal[order]), out=costs[1:])
+    late = np.zeros(len(order) + 1)
+    if len(order) > 1:
+        arrival = times[:-1] + separacion[order[:-1], order[1:]]
+        np.cumsum(np.maximum(arrival - maximo[order[1:]], 0), out=late[2:])
+    return order, times, costs, late
+
+
+def insertion_costs(instance, order, uavs, preprocessing=None):
+    """
+    (atraso, costo) del orden completo al insertar cada UAV de uavs en cada posicion de order.
+    Devuelve dos arreglos (len(uavs), len(order) + 1). Con preprocessing las posiciones que rompen
+    una precedencia forzada no se simulan y quedan con atraso y costo infinitos.
+    """
+    menor, ideal, maximo, separacion = instance.arrays()
+    base, base_times, base_costs, base_late = _base_state(instance, order)
+    m = len(base)
+    uavs = np.asarray(uavs, dtype=np.int64)
+    result_late = np.full((len(uavs), m + 1), np.inf)
+    result_cost = np.full((len(uavs), m + 1), np.inf)
+
+    # Un par por (uav, posicion); offset 0 es el UAV insertado
+    uav, position = np.divmod(np.arange(len(uavs) * (m + 1)), m + 1)
+    if preprocessing is not None:
+        low, high = preprocessing.insertion_range(base, uavs)
+        allowed = np.flatnonzero((position >= low[uav]) & (position <= high[uav]))
+        uav, position = uav[allowed], position[allowed]
+    u = uavs[uav]
+    previous = base[np.maximum(position - 1, 0)]
+    time = np.where(position > 0, base_times[np.maximum(position - 1, 0)] + separacion[previous, u], 0)
+    late = base_late[position] + np.where(position > 0, np.maximum(time - maximo[u], 0), 0)
+    time = np.maximum(menor[u], np.minimum(maximo[u], np.maximum(time, ideal[u])))
+    cost = base_costs[position] + np.abs(time - ideal[u])
+    last = position == m
+    result_late[uav[last], m] = late[last]
+    result_cost[uav[last], m] = cost[last]
+    keep = np.flatnonzero(position < m)
+    uav, position, time, late, cost, previous = uav[keep], position[keep], time[keep], late[keep], cost[keep], u[keep]
+
+    q = position.copy()
+    while len(uav):
+        # El UAV del orden base en la posicion q aterriza despues del anterior del par
+        j = base[q]
+        time = np.maximum(time + separacion[previous, j], menor[j])
+        late += np.maximum(time - maximo[j], 0)
+        time = np.minimum(maximo[j], np.maximum(time, ideal[j]))
+        cost += np.abs(time - ideal[j])
+
+        # Mismo tiempo que en el orden base (o fin del orden): lo que queda se suma de los acumulados
+        q += 1
+        finished = (time == base_times[q - 1]) | (q == m)
+        if finished.any():
+            done = np.flatnonzero(finished)
+            rest = q[done]
+            result_late[uav[done], position[done]] = late[done] + base_late[m] - base_late[rest]
+            result_cost[uav[done], position[done]] = cost[done] + base_costs[m] - base_costs[rest]
+            keep = np.flatnonzero(~finished)
+            uav, position, q, time, late, cost, j = uav[keep], position[keep], q[keep], time[keep], late[keep], cost[keep], j[keep]
+        previous = j
+
+    return result_late, result_cost
+
+
+def random_removal(instance, order, penalties, count, rng):
+    return [order[k] for k in rng.choice(len(order), count, replace=False)]
+
+
+def related_removal(instance, order, penalties, count, rng, determinism=6):
+    # Shaw: partir de un UAV al azar y sacar los de ventanas mas parecidas a alguno ya sacado
+    menor, ideal, maximo, _ = instance.arrays()
+    removed = [order[rng.integers(len(order))]]
+    remaining = [i for i in order if i != removed[0]]
+    while len(removed) < count:
+        reference = removed[rng.integers(len(removed))]
+        candidates = np.asarray(remaining)
+        distance = (np.abs(menor[candidates] - menor[reference]) + np.abs(ideal[candidates] - ideal[reference])
+                    + np.abs(maximo[candidates] - maximo[reference]))
+        ranked = np.argsort(distance, kind='stable')
+        chosen = int(ranked[int(rng.random() ** determinism * len(ranked))])
+        removed.append(remaining.pop(chosen))
+    return removed
+
+
+def worst_removal(instance, order, penalties, count, rng, determinism=3):
+    # Los de mayor penalizacion primero, con algo de azar para no sacar siempre los mismos
+    ranked = sorted(range(len(order)), key=lambda p: -penalties[p])
+    removed = []
+    while len(removed) < count:
+        removed.append(order[ranked.pop(int(rng.random() ** determinism * len(ranked)))])
+    return removed
+
+
+def _best_positions(late, cost):
+    # Por fila, las columnas ordenadas por (atraso, costo)
+    return np.lexsort((cost, late), axis=1)
+
+
+def greedy_repair(instance, order, removed, rng, preprocessing=None):
+    order = list(order)
+    pending = list(removed)
+    while pending:
+        late, cost = insertion_costs(instance, order, pending, preprocessing)
+        best = _best_positions(late, cost)[:, 0]
+        rows = np.arange(len(pending))
+        k = np.lexsort((cost[rows, best], late[rows, best]))[0]
+        order.insert(int(best[k]), pending.pop(k))
+    return order
+
+
+def regret_repair(instance, order, removed, rng, preprocessing=None):
+    order = list(order)
+    pending = list(removed)
+    while pending:
+        late, cost = insertion_costs(instance, order, pending, preprocessing)
+        if late.shape[1] < 2:
+            k, position = 0, 0
+        else:
+            ranked = _best_positions(late, cost)
+            rows = np.arange(len(pending))
+            first, second = ranked[:, 0], ranked[:, 1]
+            # Mayor arrepentimiento (en atraso y luego en costo) primero; empates por la mejor insercion
+            regret_late = late[rows, second] - late[rows, first]
+            regret_cost = cost[rows, second] - cost[rows, first]
+            k = np.lexsort((cost[rows, first], late[rows, first], -regret_cost, -regret_late))[0]
+            position = first[k]
+        order.insert(int(position), pending.pop(k))
+    return order
+
+
+DESTROY_OPERATORS = {
+    'random': random_removal,
+    'related': related_removal,
+    'worst': worst_removal,
+}
+REPAIR_OPERATORS = {
+    'greedy': greedy_repair,
+    'regret': regret_repair,
+}
+
+
+def _penalties(instance, order):
+    times = landing_times(instance, order)
+    return [abs(time - instance.ideal[i]) for time, i in zip(times, order)]
+
+
+def solve_alns(instance, order, seed=None, iterations=1000, min_remove=0.1, max_remove=0.3, segment_length=50,
+               reaction=0.1, start_worse=0.05, final_temperature=0.002, target_cost=None, time_limit=None,
+               preprocessing=None):
+    """
+    min_remove y max_remove son fracciones de n (al menos 2 UAVs). La temperatura inicial acepta
+    con probabilidad 1/2 una solucion start_worse peor que la inicial y baja geometricamente hasta
+    final_temperature veces la inicial al final (de las iteraciones o de time_limit).
+    """
+    rng = np.random.default_rng(seed)
+    start_time = timer.perf_counter()
+    n = len(order)
+    current_order = list(order)
+    current_cost = evaluate(instance, current_order)
+    best_order, best_cost = current_order[:], current_cost
+    if n < 3:
+        return best_order, best_cost[1]
+
+    low = max(2, int(min_remove * n))
+    high = max(low, min(n - 1, int(max_remove * n)))
+
+    destroy_names, repair_names = list(DESTROY_OPERATORS), list(REPAIR_OPERATORS)
+    destroy_weights = np.ones(len(destroy_names))
+    repair_weights = np.ones(len(repair_names))
+    destroy_scores, destroy_uses = np.zeros(len(destroy_names)), np.zeros(len(destroy_names))
+    repair_scores, repair_uses = np.zeros(len(repair_names)), np.zeros(len(repair_names))
+
+    start_temperature = start_worse * max(current_cost[1], 1) / np.log(2)
+    penalties = _penalties(instance, current_order)
+
+    for iteration in range(1, iterations + 1):
+        if target_cost is not None and best_cost[0] == 0 and best_cost[1] <= target_cost:
+            break
+        # Con time_limit el enfriamiento sigue al tiempo si se acaba antes que las iteraciones
+        progress = (iteration - 1) / iterations
+        if time_limit is not None:
+            elapsed = timer.perf_counter() - start_time
+            if elapsed > time_limit:
+                break
+            progress = max(progress, elapsed / time_limit)
+        temperature = start_temperature * final_temperature ** progress
+
+        d = rng.choice(len(destroy_names), p=destroy_weights / destroy_weights.sum())
+        r = rng.choice(len(repair_names), p=repair_weights / repair_weights.sum())
+        removed = DESTROY_OPERATORS[destroy_names[d]](instance, current_order, penalties, int(rng.integers(low, high + 1)), rng)
+        kept = set(removed)
+        partial = [i for i in current_order if i not in kept]
+        candidate = REPAIR_OPERATORS[repair_names[r]](instance, partial, removed, rng, preprocessing)
+        candidate_cost = evaluate(instance, candidate)
+
+        score = 0
+        if candidate_cost < best_cost:
+            best_order, best_cost = candidate[:], candidate_cost
+            score = SCORE_BEST
+        if candidate_cost < current_cost:
+            accepted = True
+            score = score or SCORE_IMPROVED
+        elif candidate_cost[0] == current_cost[0]:
+            accepted = rng.random() < np.exp(-(candidate_cost[1] - current_cost[1]) / temperature)
+            score = SCORE_ACCEPTED if accepted and candidate_cost != current_cost else 0
+        else:
+            accepted = False
+        if accepted:
+            current_order, current_cost = candidate, candidate_cost
+            penalties = _penalties(instance, current_order)
+
+        destroy_scores[d] += score
+        destroy_uses[d] += 1
+        repair_scores[r] += score
+        repair_uses[r] += 1
+
+        if iteration % segment_length == 0:
+            # Pesos nuevos segun el puntaje medio de cada operador en el segmento
+            used = destroy_uses > 0
+            destroy_weights[used] = (1 - reaction) * destroy_weights[used] + reaction * destroy_scores[used] / destroy_uses[used]
+            used = repair_uses > 0
+            repair_weights[used] = (1 - reaction) * repair_weights[used] + reaction * repair_scores[used] / repair_uses[used]
+            np.maximum(destroy_weights, 0.01, out=destroy_weights)
+            np.maximum(repair_weights, 0.01, out=repair_weights)
+            destroy_scores[:] = destroy_uses[:] = 0
+            repair_scores[:] = repair_uses[:] = 0
+
+    return best_order, best_cost[1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Optimizar el orden de aterrizaje de UAVs con ALNS.")
+    parser.add_argument("file_path", type=str, help="Ruta del archivo de datos de los UAVs")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla para el generador de numeros aleatorios")
+    parser.add_argument("--iterations", type=int, default=1000, help="Iteraciones de destruccion y reparacion")
+    parser.add_argument("--time-limit", type=float, default=None, help="Tiempo maximo en segundos")
+    args = parser.parse_args()
+
+    instance = read_instance(args.file_path)
+    start_time = timer.perf_counter()
+    initial = solve_greedy(instance)
+    order, cost = solve_alns(instance, initial, args.seed, args.iterations, time_limit=args.time_limit,
+                             preprocessing=preprocess(instance))
+    elapsed_time = timer.perf_counter() - start_time
+
+    print(f"Costo greedy: {evaluate(instance, initial)[1]}")
+    print(f"Costo ALNS: {cost}")
+    print("Orden de aterrizaje:", order)
+    bound, gap = solution_gap(instance, order, cost)
+    print(f"Cota inferior: {bound}, Gap: {gap:.2%}")
+    print(f"Tiempo de ejecución: {elapsed_time:.4f} segundos")
@@ -0,0 +1,102 @@
+import heapq
+
+import numpy as np
+
+from uav_model import is_feasible
+
+
+"""
+Cotas inferiores del costo total, para saber que tan lejos puede estar una solucion del optimo.
+
+Cota de arcos (vale para cualquier orden): si p aterriza justo antes que j, j no puede aterrizar
+antes del menor tiempo posible de p mas separacion[p][j], y la penalizacion no baja si el tiempo
+sube. Cada UAV menos el primero paga al menos el minimo sobre sus posibles antecesores (y cada
+UAV menos el ultimo, el minimo sobre sus sucesores).
+
+Cota de relajacion de ventanas (vale para ordenes factibles): en un orden factible los aterrizajes
+no se traslapan, cada UAV j ocupa el intervalo (T_j - p_j, T_j] con p_j la menor separacion con
+la que se le puede llegar, y no aterriza antes de su tiempo ideal. Es un problema de una maquina
+con fechas de liberacion ideal_j - p_j; la version con interrupciones se resuelve exacta con SRPT
+y su suma de tiempos de termino es una cota de la suma de tiempos de aterrizaje.
+"""
+
+
+def arc_lower_bound(instance):
+    menor, ideal, maximo, separacion = instance.arrays()
+    earliest = np.maximum(menor, np.minimum(maximo, ideal))
+
+    # arc[p, j]: penalizacion minima de j si aterriza justo despues de p
+    time = earliest[:, None] + separacion
+    landing = np.maximum(menor[None, :], np.minimum(maximo[None, :], np.maximum(time, ideal[None, :])))
+    arc = np.abs(landing - ideal[None, :])
+    np.fill_diagonal(arc, np.inf)
+    first = np.abs(earliest - ideal)
+
+    incoming = arc.min(axis=0)
+    outgoing = arc.min(axis=1)
+    return max(incoming.sum() - np.max(incoming - first), outgoing.sum() - outgoing.max(), 0.0)
+
+
+def _srpt_total_completion(release, processing):
+    jobs = sorted(zip(release, processing))
+    pending = []
+    time = -np.inf
+    total = 0.0
+    k = 0
+    while k < len(jobs) or pending:
+        if not pending:
+            time = max(time, jobs[k][0])
+        while k < len(jobs) and jobs[k][0] <= time:
+            heapq.heappush(pending, jobs[k][1])
+            k += 1
+
+        # Avanzar el trabajo con menos tiempo restante hasta que termine o llegue el siguiente
+        remaining = heapq.heappop(pending)
+        next_release = jobs[k][0] if k < len(jobs) else np.inf
+        if time + remaining <= next_release:
+            time += remaining
+            total += time
+        else:
+            heapq.heappush(pending, remaining - (next_release - time))
+            time = next_release
+    return total
+
+
+def window_lower_bound(instance):
+    menor, ideal, maximo, separacion = instance.arrays()
+    if instance.n < 2:
+        return 0.0
+    separacion = separacion.copy()
+    np.fill_diagonal(separacion, np.inf)
+    processing = separacion.min(axis=0)
+    earliest = np.maximum(menor, ideal)
+    return max(_srpt_total_completion(earliest - processing, processing) - ideal.sum(), 0.0)
+
+
+def lower_bound(instance, feasible=True):
+    bound = arc_lower_bound(instance)
+    if feasible:
+        bound = max(bound, window_lower_bound(instance))
+    return float(bound)
+
+
+def optimality_gap(cost, bound):
+    # Gap relativo al costo de la solucion, como en los solvers de programacion entera
+    if cost <= bound:
+        return 0.0
+    return (cost - bound) / cost
+
+
+def solution_gap(instance, order, cost):
+    # La cota de ventanas solo vale si el orden respeta las separaciones
+    bound = lower_bound(instance, feasible=is_feasible(instance, order))
+    return bound, optimality_gap(cost, bound)
+
+
+def target_cost(bound, gap):
+    # Costo maximo de una solucion cuyo gap respecto a bound sea a lo mas gap
+    if gap is None:
+        return None
+    if gap >= 1:
+        return float('inf')
+    return bound / (1 - gap)
@@ -0,0 +1,119 @@
+import time as timer
+
+from uav_model import calculate_cost, is_feasible
+from uav_solvers import solve_greedy
+
+
+"""
+Branch and bound exacto sobre ordenes de aterrizaje factibles.
+
+El orden se construye de izquierda a derecha con la misma recurrencia de calculate_cost: el
+siguiente UAV aterriza en max(tiempo del anterior + separacion, ideal), sin pasarse de su
+tiempo maximo. Un nodo es (UAVs que ya aterrizaron, ultimo UAV, tiempo del ultimo, costo).
+
+- Incumbente inicial: solve_greedy (u otro orden que se entregue), si es factible.
+- Cota: cada UAV que falta aterriza a lo menos en tiempo + su menor separacion de llegada.
+  Si para alguno eso ya pasa su tiempo maximo, el nodo no tiene completaciones factibles.
+- Dominancia: para cada (conjunto, ultimo) se guardan los pares (tiempo, costo) visitados; un
+  nodo con tiempo y costo mayores o iguales que uno ya visitado no puede mejorar y se poda.
+
+Con node_limit o time_limit la busqueda se corta y el resultado queda sin probar optimalidad.
+"""
+
+
+class BranchAndBoundResult:
+    __slots__ = ('order', 'cost', 'proven', 'nodes', 'elapsed')
+
+    def __init__(self, order, cost, proven, nodes, elapsed):
+        self.order = order
+        self.cost = cost
+        self.proven = proven
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+
+class _LimitReached(Exception):
+    pass
+
+
+def solve_branch_and_bound(instance, initial_order=None, node_limit=None, time_limit=None):
+    n = instance.n
+    menor, ideal, maximo, separacion = instance.menor, instance.ideal, instance.maximo, instance.separacion
+    min_arrival = [min((separacion[i][j] for i in range(n) if i != j), default=0) for j in range(n)]
+
+    if initial_order is None:
+        initial_order = solve_greedy(instance)
+    best_order = list(initial_order)
+    best_cost = calculate_cost(instance, best_order) if is_feasible(instance, best_order) else float('inf')
+
+    visited = {}
+    path = []
+    nodes = 0
+    start_time = timer.perf_counter()
+    deadline = start_time + time_limit if time_limit is not None else None
+
+    def bound(remaining, time):
+        extra = 0
+        for j in remaining:
+            earliest = time + min_arrival[j]
+            if earliest > maximo[j]:
+                return None
+            if earliest > ideal[j]:
+                extra += earliest - ideal[j]
+        return extra
+
+    def dominated(mask, last, time, cost):
+        # Mantener solo los pares (tiempo, costo) no dominados de este subproblema
+        pairs = visited.setdefault((mask, last), [])
+        for other_time, other_cost in pairs:
+            if other_time <= time and other_cost <= cost:
+                return True
+        pairs[:] = [(t, c) for t, c in pairs if not (time <= t and cost <= c)]
+        pairs.append((time, cost))
+        return False
+
+    def branch(mask, last, time, cost, remaining):
+        nonlocal best_order, best_cost, nodes
+        nodes += 1
+        if node_limit is not None and nodes > node_limit:
+            raise _LimitReached
+        if deadline is not None and nodes % 1024 == 0 and timer.perf_counter() > deadline:
+            raise _LimitReached
+
+        if not remaining:
+            if cost < best_cost:
+                best_order, best_cost = path[:], cost
+            return
+
+        # Hijos ordenados por el tiempo en que aterrizaria cada UAV a continuacion
+        children = []
+        for j in remaining:
+            arrival = max(menor[j], time + separacion[last][j]) if last is not None else menor[j]
+            if arrival > maximo[j]:
+                continue
+            landing = max(arrival, ideal[j])
+            children.append((landing, j))
+        children.sort()
+
+        for landing, j in children:
+            child_cost = cost + landing - ideal[j]
+            if child_cost >= best_cost:
+                continue
+            child_remaining = [k for k in remaining if k != j]
+            extra = bound(child_remaining, landing)
+            if extra is None or child_cost + extra >= best_cost:
+                continue
+            child_mask = mask | (1 << j)
+            if dominated(child_mask, j, landing, child_cost):
+                continue
+            path.append(j)
+            branch(child_mask, j, landing, child_cost, child_remaining)
+            path.pop()
+
+    proven = True
+    try:
+        branch(0, None, 0, 0, list(range(n)))
+    except _LimitReached:
+        proven = False
+
+    return BranchAndBoundResult(best_order, best_cost, proven, nodes, timer.perf_counter() - start_time)
@@ -0,0 +1,318 @@
+import hashlib
+
+import numpy as np
+
+
+"""
+Modelo compacto de una instancia de aterrizaje de UAVs.
+
+Los scripts leen el archivo a una lista de diccionarios por UAV; aqui la instancia se guarda
+como listas paralelas (tiempo menor, ideal y maximo, y la matriz de separaciones), que es lo
+que necesitan los solvers y lo que se puede enviar barato a otros procesos.
+
+La recurrencia de costo es la misma de calculate_cost: cada UAV aterriza lo mas cerca posible
+de su tiempo ideal sin salir de su ventana, y el siguiente no puede aterrizar antes del tiempo
+asignado mas la separacion. La separacion se toma entre el UAV anterior y el siguiente,
+separacion[anterior][siguiente].
+"""
+
+
+def content_hash(content):
+    if isinstance(content, str):
+        content = content.encode()
+    return hashlib.sha256(content).hexdigest()
+
+
+class Instance:
+    __slots__ = ('n', 'menor', 'ideal', 'maximo', 'separacion', 'content_hash', '_arrays')
+
+    def __init__(self, menor, ideal, maximo, separacion, content_hash=None):
+        self.n = len(ideal)
+        self.menor = menor
+        self.ideal = ideal
+        self.maximo = maximo
+        self.separacion = separacion
+        self.content_hash = content_hash
+        self._arrays = None
+
+    def __getstate__(self):
+        # Las matrices de numpy se reconstruyen en el proceso que las necesite
+        return (self.menor, self.ideal, self.maximo, self.separacion, self.content_hash)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def arrays(self):
+        if self._arrays is None:
+            self._arrays = (
+                np.asarray(self.menor, dtype=float),
+                np.asarray(self.ideal, dtype=float),
+                np.asarray(self.maximo, dtype=float),
+                np.asarray(self.separacion, dtype=float),
+            )
+        return self._arrays
+
+    def to_uav_data(self):
+        # Misma estructura que produce read_file en los scripts
+        return [
+            {
+                'index': i,
+                'tiempo_aterrizaje_menor': self.menor[i],
+                'tiempo_aterrizaje_ideal': self.ideal[i],
+                'tiempo_aterrizaje_maximo': self.maximo[i],
+                'tiempos_aterrizaje': list(self.separacion[i]),
+                'orden': None,
+            }
+            for i in range(self.n)
+        ]
+
+
+class Solution:
+    """
+    Orden de aterrizaje ya evaluado, inmutable: order (UAV por posicion), position (posicion por
+    UAV, la permutacion inversa), times (tiempo asignado por posicion), lateness y cost como en
+    evaluate. Se calcula en una pasada O(n) y se puede pasar entre etapas sin copiarlo.
+    """
+    __slots__ = ('order', 'position', 'times', 'lateness', 'cost')
+
+    def __init__(self, instance, order):
+        order = tuple(order)
+        position = [0] * len(order)
+        for p, i in enumerate(order):
+            position[i] = p
+        times = landing_times(instance, order)
+        lateness, cost = evaluate(instance, order)
+        for name, value in (('order', order), ('position', tuple(position)), ('times', tuple(times)),
+                            ('lateness', lateness), ('cost', cost)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Solution es inmutable")
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+    @property
+    def feasible(self):
+        return self.lateness == 0
+
+    def assigned_times(self):
+        # Tiempo asignado por UAV (no por posicion), como 'tiempo_aterrizaje_asignado'
+        return [self.times[p] for p in self.position]
+
+
+class Schedule:
+    """
+    Orden de aterrizaje mutable para las busquedas locales. Mantiene sincronizados el orden, su
+    inversa (position[uav]), y por posicion el tiempo asignado, la penalizacion y el costo y
+    atraso acumulados. Un movimiento solo se vuelve a simular desde la primera posicion que
+    cambia, y los *_evaluation dan el (atraso, costo) de un movimiento sin aplicarlo. Los
+    diccionarios de uav_data solo se escriben al pedir la salida (materialize, O(n)).
+    """
+    __slots__ = ('instance', 'order', 'position', 'times', 'penalties', 'costs', 'late')
+
+    def __init__(self, instance, order):
+        self.instance = instance
+        self.order = list(order)
+        n = len(self.order)
+        self.position = [0] * n
+        for p, i in enumerate(self.order):
+            self.position[i] = p
+        self.times = [0] * n
+        self.penalties = [0] * n
+        self.costs = [0] * n
+        self.late = [0] * n
+        self._simulate(0)
+
+    @property
+    def cost(self):
+        return self.costs[-1] if self.costs else 0
+
+    @property
+    def lateness(self):
+        return self.late[-1] if self.late else 0
+
+    def evaluation(self):
+        return self.lateness, self.cost
+
+    def landing_time(self, uav):
+        return self.times[self.position[uav]]
+
+    def penalty(self, uav):
+        return self.penalties[self.position[uav]]
+
+    def _simulate(self, start, store=True):
+        # (atraso, costo) de self.order desde start, reutilizando lo simulado antes de start; con
+        # store se guardan los tiempos y acumulados de cada posicion desde start
+        instance, order = self.instance, self.order
+        menor, ideal, maximo, separacion = instance.menor, instance.ideal, instance.maximo, instance.separacion
+        times, penalties, costs, late = self.times, self.penalties, self.costs, self.late
+        if start == 0:
+            total_cost = total_lateness = 0
+            time, prev = 0, None
+        else:
+            total_cost, total_lateness, prev = costs[start - 1], late[start - 1], order[start - 1]
+            closest_time = times[start - 1]
+        for p in range(start, len(order)):
+            i = order[p]
+            if prev is not None:
+                time = closest_time + separacion[prev][i]
+                if time > maximo[i]:
+                    total_lateness += time - maximo[i]
+            closest_time = max(menor[i], min(maximo[i], max(time, ideal[i])))
+            penalty = abs(closest_time - ideal[i])
+            total_cost += penalty
+            if store:
+                times[p], penalties[p], costs[p], late[p] = closest_time, penalty, total_cost, total_lateness
+            prev = i
+        return total_lateness, total_cost
+
+    def evaluate_from(self, start):
+        # (atraso, costo) de self.order tal como esta, sin tocar lo simulado
+        return self._simulate(start, store=False)
+
+    def swap_evaluation(self, i, j):
+        if i > j:
+            i, j = j, i
+        order = self.order
+        order[i], order[j] = order[j], order[i]
+        result = self.evaluate_from(i)
+        order[i], order[j] = order[j], order[i]
+        return result
+
+    def reversal_evaluation(self, i, j):
+        if i > j:
+            i, j = j, i
+        order = self.order
+        order[i:j + 1] = order[i:j + 1][::-1]
+        result = self.evaluate_from(i)
+        order[i:j + 1] = order[i:j + 1][::-1]
+        return result
+
+    def swap(self, i, j):
+        if i > j:
+            i, j = j, i
+        order, position = self.order, self.position
+        order[i], order[j] = order[j], order[i]
+        position[order[i]], position[order[j]] = i, j
+        self._simulate(i)
+
+    def reverse(self, i, j):
+        if i > j:
+            i, j = j, i
+        order, position = self.order, self.position
+        order[i:j + 1] = order[i:j + 1][::-1]
+        for p in range(i, j + 1):
+            position[order[p]] = p
+        self._simulate(i)
+
+    def freeze(self):
+        return Solution(self.instance, self.order)
+
+    def materialize(self, uav_data):
+        # Escribir orden, tiempo asignado y penalizacion en los diccionarios de read_file
+        for uav in uav_data:
+            p = self.position[uav['index']]
+            uav['orden'] = p
+            uav['tiempo_aterrizaje_asignado'] = self.times[p]
+            uav['penalizacion'] = self.penalties[p]
+
+
+def instance_from_uav_data(uav_data):
+    # uav_data en el formato de read_file, ordenado por 'index'
+    return Instance(
+        [uav['tiempo_aterrizaje_menor'] for uav in uav_data],
+        [uav['tiempo_aterrizaje_ideal'] for uav in uav_data],
+        [uav['tiempo_aterrizaje_maximo'] for uav in uav_data],
+        [uav['tiempos_aterrizaje'] for uav in uav_data],
+    )
+
+
+def parse_instance(content):
+    if isinstance(content, bytes):
+        content = content.decode()
+    tokens = content.split()
+    D = int(tokens[0])
+    menor, ideal, maximo, separacion = [], [], [], []
+    current = 1
+    for _ in range(D):
+        menor.append(float(tokens[current]))
+        ideal.append(float(tokens[current + 1]))
+        maximo.append(float(tokens[current + 2]))
+        current += 3
+        separacion.append([float(t) for t in tokens[current:current + D]])
+        current += D
+    return Instance(menor, ideal, maximo, separacion, content_hash(content))
+
+
+def read_instance(file_path):
+    with open(file_path, 'rb') as file:
+        return parse_instance(file.read())
+
+
+def landing_times(instance, order):
+    menor, ideal, maximo, separacion = instance.menor, instance.ideal, instance.maximo, instance.separacion
+    times = []
+    time = 0
+    prev = None
+    for i in order:
+        if prev is not None:
+            time = times[-1] + separacion[prev][i]
+        times.append(max(menor[i], min(maximo[i], max(time, ideal[i]))))
+        prev = i
+    return times
+
+
+def calculate_cost(instance, order):
+    menor, ideal, maximo, separacion = instance.menor, instance.ideal, instance.maximo, instance.separacion
+    total_cost = 0
+    time = 0
+    prev = None
+    for i in order:
+        if prev is not None:
+            time = closest_time + separacion[prev][i]
+        closest_time = max(menor[i], min(maximo[i], max(time, ideal[i])))
+        total_cost += abs(closest_time - ideal[i])
+        prev = i
+    return total_cost
+
+
+def evaluate(instance, order):
+    # (atraso, costo): el atraso suma cuanto tendria que pasarse cada UAV de su tiempo maximo para
+    # respetar la separacion. Un orden es factible si el atraso es 0; comparar las tuplas prefiere
+    # siempre un orden factible y, entre factibles, el de menor costo
+    menor, ideal, maximo, separacion = instance.menor, instance.ideal, instance.maximo, instance.separacion
+    total_cost = total_lateness = 0
+    time = 0
+    prev = None
+    for i in order:
+        if prev is not None:
+            time = closest_time + separacion[prev][i]
+            if time > maximo[i]:
+                total_lateness += time - maximo[i]
+        closest_time = max(menor[i], min(maximo[i], max(time, ideal[i])))
+        total_cost += abs(closest_time - ideal[i])
+        prev = i
+    return total_lateness, total_cost
+
+
+def is_feasible(instance, order, preprocessing=None):
+    # Factible si ningun UAV tiene que aterrizar despues de su tiempo maximo para respetar la separacion;
+    # con un preprocesamiento (uav_preprocess) se compara con el latest ajustado, que corta antes
+    menor, ideal, maximo, separacion = instance.menor, instance.ideal, instance.maximo, instance.separacion
+    if preprocessing is not None:
+        maximo = preprocessing.latest.tolist()
+    time = 0
+    prev = None
+    for i in order:
+        if prev is not None:
+            time = closest_time + separacion[prev][i]
+        if max(time, menor[i]) > maximo[i]:
+            return False
+        closest_time = max(menor[i], max(time, ideal[i]))
+        prev = i
+    return True
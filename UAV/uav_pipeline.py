@@ -0,0 +1,127 @@
+import argparse
+import time
+
+from uav_alns import solve_alns
+from uav_bounds import lower_bound, solution_gap, target_cost
+from uav_exact import solve_branch_and_bound
+from uav_model import Solution, read_instance
+from uav_preprocess import preprocess
+from uav_solvers import solve_greedy, solve_greedy_stochastic, solve_hill_climbing, solve_steepest_descent, solve_tabu_search
+
+
+"""
+Cadena de solvers sobre una misma Instance en memoria, p. ej. grasp -> hill-climbing -> tabu.
+
+La instancia se lee una sola vez y cada etapa recibe la Solution de la anterior y entrega una
+nueva; una Solution es inmutable, asi que las etapas no se copian datos entre si ni modifican lo
+que recibieron. Las construcciones (greedy, grasp) ignoran la solucion de entrada. Todas las
+etapas tienen la firma (instance, solution, seed, budget, target_cost, preprocessing) -> Solution,
+con budget y target_cost como en uav_solvers.ALGORITHMS; el preprocesamiento de la instancia
+(uav_preprocess) tambien se calcula una sola vez y lo comparten todas las etapas de mejora.
+"""
+
+
+def stage_greedy(instance, solution, seed, budget, target_cost, preprocessing):
+    return Solution(instance, solve_greedy(instance))
+
+
+def stage_grasp(instance, solution, seed, budget, target_cost, preprocessing):
+    return Solution(instance, solve_greedy_stochastic(instance, seed))
+
+
+def stage_hill_climbing_any(instance, solution, seed, budget, target_cost, preprocessing):
+    order, _ = solve_hill_climbing(instance, solution.order, seed, neighborhood='reversal',
+                                   max_iterations=budget or 1000, target_cost=target_cost, preprocessing=preprocessing)
+    return Solution(instance, order)
+
+
+def stage_hill_climbing_best(instance, solution, seed, budget, target_cost, preprocessing):
+    order, _ = solve_hill_climbing(instance, solution.order, seed, neighborhood='swap', best_improvement=True,
+                                   max_iterations=budget or 1000, target_cost=target_cost, preprocessing=preprocessing)
+    return Solution(instance, order)
+
+
+def stage_hill_climbing_full(instance, solution, seed, budget, target_cost, preprocessing):
+    order, _ = solve_steepest_descent(instance, solution.order, 'reversal', max_iterations=budget or 1000,
+                                      target_cost=target_cost, preprocessing=preprocessing)
+    return Solution(instance, order)
+
+
+def stage_tabu(instance, solution, seed, budget, target_cost, preprocessing):
+    order, _ = solve_tabu_search(instance, solution.order, seed, iterations=budget or 1000, target_cost=target_cost,
+                                 preprocessing=preprocessing)
+    return Solution(instance, order)
+
+
+def stage_alns(instance, solution, seed, budget, target_cost, preprocessing):
+    order, _ = solve_alns(instance, solution.order, seed, iterations=budget or 1000, target_cost=target_cost,
+                          preprocessing=preprocessing)
+    return Solution(instance, order)
+
+
+def stage_branch_and_bound(instance, solution, seed, budget, target_cost, preprocessing):
+    # El incumbente inicial es la solucion de la etapa anterior (si es factible)
+    result = solve_branch_and_bound(instance, solution.order, node_limit=budget)
+    if result.cost == float('inf'):
+        # Sin ningun orden factible se mantiene la solucion recibida
+        return solution
+    return Solution(instance, result.order)
+
+
+STAGES = {
+    'greedy': stage_greedy,
+    'grasp': stage_grasp,
+    'hill-climbing-any': stage_hill_climbing_any,
+    'hill-climbing-best': stage_hill_climbing_best,
+    'hill-climbing-full': stage_hill_climbing_full,
+    'tabu': stage_tabu,
+    'alns': stage_alns,
+    'branch-and-bound': stage_branch_and_bound,
+}
+CONSTRUCTIONS = ('greedy', 'grasp')
+
+
+def run_pipeline(instance, stages, seed=0, budget=None, target_cost=None, preprocessing=None):
+    """
+    Corre las etapas en orden y devuelve una lista de (etapa, Solution, segundos). Si la primera
+    etapa no es una construccion se parte desde greedy. Una etapa que empeora la solucion (en
+    (atraso, costo)) no la reemplaza: la siguiente etapa parte desde la mejor hasta ahora. Sin
+    preprocessing se preprocesa la instancia aca, una vez para todas las etapas.
+    """
+    stages = list(stages)
+    if not stages or stages[0] not in CONSTRUCTIONS:
+        stages.insert(0, 'greedy')
+    if preprocessing is None:
+        preprocessing = preprocess(instance)
+
+    results = []
+    best = None
+    for name in stages:
+        start_time = time.perf_counter()
+        solution = STAGES[name](instance, best, seed, budget, target_cost, preprocessing)
+        results.append((name, solution, time.perf_counter() - start_time))
+        if best is None or (solution.lateness, solution.cost) < (best.lateness, best.cost):
+            best = solution
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Encadenar construccion y mejora sobre una instancia de UAVs.")
+    parser.add_argument("file_path", type=str, help="Ruta del archivo de datos de los UAVs")
+    parser.add_argument("--stages", type=str, nargs="+", default=["grasp", "hill-climbing-any", "tabu"], choices=sorted(STAGES), help="Etapas en orden")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla para las etapas aleatorias")
+    parser.add_argument("--budget", type=int, default=None, help="Iteraciones (o nodos en branch-and-bound) por etapa")
+    parser.add_argument("--gap", type=float, default=None, help="Detenerse al encontrar una solucion con este gap respecto a la cota inferior (p. ej. 0.01)")
+    args = parser.parse_args()
+
+    instance = read_instance(args.file_path)
+    results = run_pipeline(instance, args.stages, args.seed, args.budget, target_cost(lower_bound(instance), args.gap))
+
+    for name, solution, elapsed in results:
+        state = "factible" if solution.feasible else f"infactible (atraso {solution.lateness})"
+        print(f"{name:>20}: costo {solution.cost} {state} en {elapsed:.4f} segundos")
+    best = min((solution for _, solution, _ in results), key=lambda solution: (solution.lateness, solution.cost))
+    print("Costo total:", best.cost)
+    print("Orden de aterrizaje:", list(best.order))
+    bound, gap = solution_gap(instance, best.order, best.cost)
+    print(f"Cota inferior: {bound}, Gap: {gap:.2%}")
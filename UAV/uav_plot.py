@@ -0,0 +1,55 @@
+import numpy as np
+
+
+"""
+Grafico de la programacion de aterrizaje.
+
+Todos los UAVs se dibujan con pocas colecciones (una para las ventanas y una por cada tipo de
+tiempo), en vez de un ax.plot y un ax.text por punto, asi que el costo de dibujar no depende de
+la cantidad de objetos. Sobre label_threshold UAVs solo se etiqueta uno de cada tantos.
+Si se entrega output se escribe directamente al archivo sin abrir ninguna ventana.
+"""
+
+
+def plot_schedule(menor, ideal, maximo, asignado, orden, output=None, label_threshold=200, dpi=100):
+    menor = np.asarray(menor, dtype=float)
+    ideal = np.asarray(ideal, dtype=float)
+    maximo = np.asarray(maximo, dtype=float)
+    asignado = np.asarray(asignado, dtype=float)
+    y = np.asarray(orden, dtype=float)
+    D = len(y)
+
+    if output is not None:
+        # Sin pyplot: no se carga ningun backend interactivo ni se bloquea en plt.show()
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        fig = Figure(figsize=(8, max(4.8, min(D * 0.02, 60))))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+    else:
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots()
+
+    # Con muchos UAVs los puntos se achican y se rasterizan para que el archivo no crezca con D
+    large = D > label_threshold
+    size = 4 if large else 36
+    ax.hlines(y, menor, maximo, colors='lightgray', linewidths=0.5 if large else 1, zorder=1, rasterized=large)
+    for values, color, scale in ((menor, 'red', 1), (ideal, 'green', 1), (maximo, 'blue', 1), (asignado, 'black', 1.8)):
+        ax.scatter(values, y, s=size * scale, color=color, zorder=2, rasterized=large)
+
+    # Etiquetas: todas bajo el umbral, y sobre el umbral solo una de cada step filas
+    step = 1 if not large else int(np.ceil(D / label_threshold))
+    labeled = np.argsort(y)[::step]
+    for values, color, ha in ((menor, 'red', 'right'), (ideal, 'green', 'right'), (maximo, 'blue', 'left'), (asignado, 'black', 'left')):
+        for i in labeled:
+            ax.text(values[i], y[i], f"{values[i]:.1f}", ha=ha, va='bottom', color=color, fontsize=8 if large else None)
+
+    ax.set_xlabel('Tiempo')
+    ax.set_ylabel('Orden de aterrizaje')
+    ax.set_title('Programacion de aterrizaje de UAVs')
+    fig.tight_layout()
+
+    if output is not None:
+        fig.savefig(output, dpi=dpi)
+    else:
+        plt.show()
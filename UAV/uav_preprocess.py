@@ -0,0 +1,140 @@
+import argparse
+
+import numpy as np
+
+from uav_model import read_instance
+
+
+"""
+Preprocesamiento de una instancia antes de buscar: ventanas ajustadas y precedencias forzadas.
+
+En un orden factible cada UAV aterriza en T_i, con earliest_i = max(menor, min(maximo, ideal))
+<= T_i <= maximo_i, y los tiempos no bajan a lo largo del orden (las separaciones son
+positivas). Si j aterriza antes que i, el antecesor de i aterriza en T_j o despues, asi que
+T_i >= T_j + min_in_i, con min_in_i la menor separacion con la que se puede llegar a i. Luego:
+
+- i va antes que j en todo orden factible si earliest_j + min_in_i > latest_i.
+- Si i va antes que j: earliest_j >= earliest_i + min_in_j y latest_i <= latest_j - min_out_i,
+  con min_out_i la menor separacion con la que se puede salir de i.
+
+Las dos reglas se aplican hasta que nada cambie (con la clausura transitiva de las
+precedencias). Un orden que pone a j antes que i con i -> j forzada, o en que algun UAV no
+alcanza a aterrizar antes de su latest, no puede ser factible: los vecindarios de uav_solvers y
+las inserciones de uav_alns descartan esos movimientos sin evaluarlos, e is_feasible corta con
+latest en vez de maximo.
+"""
+
+
+class Preprocessing:
+    __slots__ = ('earliest', 'latest', 'before', 'infeasible', 'rounds')
+
+    def __init__(self, earliest, latest, before, infeasible, rounds):
+        self.earliest = earliest
+        self.latest = latest
+        # before[i, j]: i aterriza antes que j en todo orden factible
+        self.before = before
+        self.infeasible = infeasible
+        self.rounds = rounds
+
+    @property
+    def precedences(self):
+        return int(self.before.sum())
+
+    def respects(self, order):
+        position = np.empty(len(order), dtype=np.int64)
+        position[np.asarray(order)] = np.arange(len(order))
+        return not (self.before & (position[:, None] > position[None, :])).any()
+
+    def allows_swap(self, order, i, j):
+        # El UAV de la posicion menor pasa detras de los de (i, j] y el de la mayor delante de los de [i, j)
+        if i > j:
+            i, j = j, i
+        u, v = order[i], order[j]
+        return not (self.before[u, order[i + 1:j + 1]].any() or self.before[order[i:j], v].any())
+
+    def allows_reversal(self, order, i, j):
+        # Se invierten todos los pares del segmento; no debe haber una precedencia forzada entre ellos en este sentido
+        if i > j:
+            i, j = j, i
+        segment = order[i:j + 1]
+        return not np.triu(self.before[np.ix_(segment, segment)], 1).any()
+
+    def allowed_moves(self, order, neighborhood, first, second):
+        # allows_swap o allows_reversal para todos los pares de posiciones (first[k] < second[k]) a la vez
+        forced = self.before[np.ix_(order, order)].astype(np.int32)
+        if neighborhood == 'swap':
+            rows = np.cumsum(forced, axis=1)
+            cols = np.cumsum(forced, axis=0)
+            behind = rows[first, second] - rows[first, first]
+            ahead = cols[second - 1, second] - np.where(first > 0, cols[first - 1, second], 0)
+            return (behind == 0) & (ahead == 0)
+        # Pares forzados dentro del segmento, con sumas acumuladas 2D del triangulo superior
+        n = len(order)
+        total = np.zeros((n + 1, n + 1), dtype=np.int32)
+        total[1:, 1:] = np.triu(forced, 1).cumsum(axis=0).cumsum(axis=1)
+        inside = total[second + 1, second + 1] - total[first, second + 1] - total[second + 1, first] + total[first, first]
+        return inside == 0
+
+    def insertion_range(self, order, uavs):
+        # Para cada UAV de uavs, las posiciones [low, high] de order donde insertarlo respetan las precedencias
+        order, uavs = np.asarray(order, dtype=np.int64), np.asarray(uavs, dtype=np.int64)
+        m = len(order)
+        predecessors = self.before[np.ix_(order, uavs)]
+        low = np.where(predecessors.any(axis=0), m - np.argmax(predecessors[::-1], axis=0), 0)
+        successors = self.before[np.ix_(uavs, order)]
+        high = np.where(successors.any(axis=1), np.argmax(successors, axis=1), m)
+        return low, high
+
+
+def preprocess(instance, max_rounds=100):
+    menor, ideal, maximo, separacion = instance.arrays()
+    n = instance.n
+    earliest = np.maximum(menor, np.minimum(maximo, ideal))
+    latest = maximo.copy()
+    before = np.zeros((n, n), dtype=bool)
+    if n < 2:
+        return Preprocessing(earliest, latest, before, bool((earliest > latest).any()), 0)
+
+    arcs = separacion.copy()
+    np.fill_diagonal(arcs, np.inf)
+    min_in = arcs.min(axis=0)
+    min_out = arcs.min(axis=1)
+
+    rounds = 0
+    while rounds < max_rounds:
+        rounds += 1
+        forced = earliest[None, :] + min_in[:, None] > latest[:, None]
+        np.fill_diagonal(forced, False)
+        forced |= before
+        # Clausura transitiva
+        while True:
+            closure = forced | ((forced.astype(np.int32) @ forced.astype(np.int32)) > 0)
+            np.fill_diagonal(closure, False)
+            if (closure == forced).all():
+                break
+            forced = closure
+
+        new_earliest = np.maximum(earliest, np.where(forced, earliest[:, None], -np.inf).max(axis=0) + min_in)
+        new_latest = np.minimum(latest, np.where(forced, latest[None, :], np.inf).min(axis=1) - min_out)
+        if (forced == before).all() and (new_earliest == earliest).all() and (new_latest == latest).all():
+            break
+        before, earliest, latest = forced, new_earliest, new_latest
+
+    infeasible = bool((earliest > latest).any() or (before & before.T).any())
+    return Preprocessing(earliest, latest, before, infeasible, rounds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ajustar ventanas y fijar precedencias de una instancia de UAVs.")
+    parser.add_argument("file_path", type=str, help="Ruta del archivo de datos de los UAVs")
+    args = parser.parse_args()
+
+    instance = read_instance(args.file_path)
+    preprocessing = preprocess(instance)
+    menor, ideal, maximo, _ = instance.arrays()
+    print(f"UAVs: {instance.n}")
+    print(f"Rondas: {preprocessing.rounds}")
+    print(f"Precedencias forzadas: {preprocessing.precedences} de {instance.n * (instance.n - 1) // 2} pares")
+    print(f"Ventana media: {np.mean(maximo - menor):.1f} -> {np.mean(preprocessing.latest - preprocessing.earliest):.1f}")
+    if preprocessing.infeasible:
+        print("La instancia no tiene ordenes factibles")
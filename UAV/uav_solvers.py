@@ -0,0 +1,387 @@
+import numpy as np
+
+from uav_model import Schedule, calculate_cost
+from uav_preprocess import Preprocessing, preprocess
+
+
+"""
+Solvers sobre una Instance de uav_model. Son los mismos algoritmos de los scripts
+(greedy.py, greedy-stochastic.py, hill-climbing-*.py) pero trabajan con ordenes de aterrizaje
+(listas de indices de UAV) en vez de modificar los diccionarios de uav_data.
+"""
+
+
+def solve_greedy(instance):
+    # Ordenar los UAVs por su tiempo de aterrizaje ideal en orden ascendente
+    return sorted(range(instance.n), key=lambda i: instance.ideal[i])
+
+
+def solve_greedy_stochastic(instance, seed, rcl_size=3, decay=0.5):
+    rng = np.random.default_rng(seed)
+    sorted_uavs = solve_greedy(instance)
+
+    order = []
+    while sorted_uavs:
+        # Seleccionar uno de los k UAVs mas cercanos al tiempo ideal, favoreciendo a los primeros
+        k = min(len(sorted_uavs), rcl_size)
+        probabilities = [np.exp(-decay * j) for j in range(k)]
+        probabilities = [p / sum(probabilities) for p in probabilities]
+        idx = rng.choice(range(k), p=probabilities)
+        order.append(sorted_uavs.pop(idx))
+    return order
+
+
+def random_reversal(n, rng):
+    i, j = np.sort(rng.choice(n, 2, replace=False))
+    return i, j
+
+
+def random_swap(n, rng):
+    i, j = rng.choice(n, 2, replace=False)
+    return i, j
+
+
+# Cada vecindario sortea un par de posiciones (i, j) y tiene su evaluacion y su movimiento en Schedule,
+# y en Preprocessing la prueba de que el movimiento no rompe una precedencia forzada
+NEIGHBORHOODS = {
+    'reversal': (random_reversal, Schedule.reversal_evaluation, Schedule.reverse, Preprocessing.allows_reversal),
+    'swap': (random_swap, Schedule.swap_evaluation, Schedule.swap, Preprocessing.allows_swap),
+}
+
+
+def solve_hill_climbing(instance, order, seed=None, neighborhood='reversal', best_improvement=False,
+                        max_iterations=1000, max_no_improvement=100, max_attempts=10, target_cost=None,
+                        preprocessing=None):
+    rng = np.random.default_rng(seed)
+    get_random_move, evaluate_move, apply_move, allows_move = NEIGHBORHOODS[neighborhood]
+
+    schedule = Schedule(instance, order)
+    n = len(schedule.order)
+    current_cost = schedule.evaluation()
+    no_improvement_counter = 0
+
+    for _ in range(max_iterations):
+        if no_improvement_counter >= max_no_improvement:
+            break
+
+        # Detenerse si la solucion ya esta dentro del gap pedido respecto a la cota inferior
+        if target_cost is not None and current_cost[0] == 0 and current_cost[1] <= target_cost:
+            break
+
+        best_move = None
+        best_neighbor_cost = (float('inf'), float('inf'))
+
+        # Any improvement: el primer vecino factible. Best improvement: el mejor de max_attempts vecinos
+        for _ in range(max_attempts):
+            i, j = get_random_move(n, rng)
+            # Un vecino que rompe una precedencia forzada no puede ser factible: ni se evalua
+            if preprocessing is not None and not allows_move(preprocessing, schedule.order, i, j):
+                continue
+            neighbor_cost = evaluate_move(schedule, i, j)
+            if neighbor_cost[0] > current_cost[0]:
+                continue
+
+            if neighbor_cost < best_neighbor_cost:
+                best_move = (i, j)
+                best_neighbor_cost = neighbor_cost
+
+            if not best_improvement:
+                break
+
+        if best_move is not None and best_neighbor_cost < current_cost:
+            apply_move(schedule, *best_move)
+            current_cost = best_neighbor_cost
+            no_improvement_counter = 0
+        else:
+            no_improvement_counter += 1
+
+    return schedule.order, current_cost[1]
+
+
+def scan_moves(schedule, neighborhood, first, second, cutoff=None):
+    """
+    (atraso, costo) de cada movimiento (first[k], second[k]) del vecindario ('swap' o 'reversal',
+    con first < second) sobre el orden de schedule, sin aplicarlo. Todos los movimientos se simulan
+    a la vez con NumPy, de a una posicion, partiendo del estado de schedule antes de first. Un
+    movimiento se termina apenas un UAV que no se movio queda con el mismo tiempo que en schedule:
+    lo que sigue es igual y se suma de los acumulados. En un intercambio eso tambien pasa entre
+    first y second, y entonces se salta directo a second.
+
+    Con cutoff = (atraso, costo), un movimiento cuyo atraso y costo acumulados ya llegan a cutoff
+    no puede quedar por debajo (los dos solo suben a lo largo del orden): se deja de simular y se
+    devuelve como (inf, inf). Para buscar movimientos que mejoren basta con cutoff = el actual, y
+    la mayoria de los movimientos se descarta en las primeras posiciones.
+    """
+    menor, ideal, maximo, separacion = schedule.instance.arrays()
+    order = np.asarray(schedule.order, dtype=np.int64)
+    n = len(order)
+    times = np.asarray(schedule.times, dtype=float)
+    costs = np.zeros(n + 1)
+    costs[1:] = schedule.costs
+    late = np.zeros(n + 1)
+    late[1:] = schedule.late
+    swap = neighborhood == 'swap'
+
+    result_late = np.empty(len(first))
+    result_cost = np.empty(len(first))
+    move = np.arange(len(first))
+    i, j = np.asarray(first, dtype=np.int64), np.asarray(second, dtype=np.int64)
+    q = i.copy()
+    at_start = q == 0
+    prev = order[np.maximum(q - 1, 0)]
+    time = times[np.maximum(q - 1, 0)]
+    cost = costs[q]
+    lateness = late[q]
+
+    while len(move):
+        # UAV en la posicion q del orden con el movimiento aplicado
+        if swap:
+            u = order[np.where(q == i, j, np.where(q == j, i, q))]
+        else:
+            u = order[np.where(q <= j, i + j - q, q)]
+        arrival = time + separacion[prev, u]
+        if at_start is not None:
+            arrival = np.where(at_start, 0, arrival)
+            lateness = lateness + np.where(at_start, 0, np.maximum(arrival - maximo[u], 0))
+            at_start = None
+        else:
+            lateness = lateness + np.maximum(arrival - maximo[u], 0)
+        time = np.maximum(menor[u], np.minimum(maximo[u], np.maximum(arrival, ideal[u])))
+        cost = cost + np.abs(time - ideal[u])
+
+        same = time == times[q]
+        finished = (q == n - 1) | (same & (q > j))
+        done = finished
+        if cutoff is not None:
+            pruned = (lateness > cutoff[0]) | ((lateness == cutoff[0]) & (cost >= cutoff[1]))
+            result_late[move[pruned]] = np.inf
+            result_cost[move[pruned]] = np.inf
+            finished &= ~pruned
+            done = finished | pruned
+        if done.any():
+            rest = q[finished] + 1
+            result_late[move[finished]] = lateness[finished] + late[n] - late[rest]
+            result_cost[move[finished]] = cost[finished] + costs[n] - costs[rest]
+            keep = ~done
+            move, i, j, q, u, time, cost, lateness, same = (move[keep], i[keep], j[keep], q[keep], u[keep], time[keep],
+                                                           cost[keep], lateness[keep], same[keep])
+        prev = u
+        if swap:
+            jump = same & (q > i) & (q < j)
+            if jump.any():
+                cost = cost + np.where(jump, costs[j] - costs[q + 1], 0)
+                lateness = lateness + np.where(jump, late[j] - late[q + 1], 0)
+                time = np.where(jump, times[j - 1], time)
+                prev = np.where(jump, order[j - 1], u)
+                q = np.where(jump, j - 1, q)
+        q = q + 1
+
+    return result_late, result_cost
+
+
+def solve_steepest_descent(instance, order, neighborhood='reversal', max_iterations=1000, dont_look=True,
+                           target_cost=None, preprocessing=None):
+    """
+    Best improvement de verdad: en cada iteracion se evaluan todos los intercambios o inversiones
+    de segmento (2-opt) con scan_moves y se aplica el mejor, hasta que ninguno mejore.
+
+    Con dont_look, un UAV que no aparece en ningun movimiento que mejore queda marcado y los pares
+    con los dos extremos marcados no se evaluan; se desmarcan los UAVs en las posiciones alrededor
+    de cada movimiento aplicado.
+    """
+    schedule = Schedule(instance, order)
+    n = len(schedule.order)
+    apply_move = Schedule.swap if neighborhood == 'swap' else Schedule.reverse
+    first, second = np.triu_indices(n, 1)
+    looking = np.ones(n, dtype=bool)
+    current_cost = schedule.evaluation()
+
+    for _ in range(max_iterations):
+        if target_cost is not None and current_cost[0] == 0 and current_cost[1] <= target_cost:
+            break
+
+        current_order = np.asarray(schedule.order)
+        candidates = looking[current_order[first]] | looking[current_order[second]]
+        if preprocessing is not None:
+            candidates &= preprocessing.allowed_moves(schedule.order, neighborhood, first, second)
+        i, j = first[candidates], second[candidates]
+        if not len(i):
+            break
+
+        late, cost = scan_moves(schedule, neighborhood, i, j, cutoff=current_cost)
+        improving = (late < current_cost[0]) | ((late == current_cost[0]) & (cost < current_cost[1]))
+        if not improving.any():
+            break
+        if dont_look:
+            looking[:] = False
+            looking[current_order[i[improving]]] = True
+            looking[current_order[j[improving]]] = True
+        else:
+            looking[:] = True
+
+        best = np.lexsort((cost, late))[0]
+        i, j = int(i[best]), int(j[best])
+        apply_move(schedule, i, j)
+        current_cost = schedule.evaluation()
+        touched = [p for p in (i - 1, i, i + 1, j - 1, j, j + 1) if 0 <= p < n]
+        looking[[schedule.order[p] for p in touched]] = True
+
+    return schedule.order, current_cost[1]
+
+
+"""
+Tabu search con memoria de corto y largo plazo sobre asignaciones (uav, posicion).
+
+- recency[u, p]: ultima iteracion en que el UAV u dejo la posicion p. Volver a p antes de
+  tabu_list_size iteraciones es tabu, salvo que el vecino mejore la mejor solucion (aspiracion).
+- frequency[u, p]: iteraciones que el UAV u ha pasado en la posicion p. Se actualiza solo cuando
+  u deja p, asi que mantener la memoria cuesta O(1) por movimiento.
+
+Los vecinos se comparan por evaluate, (atraso, costo), asi que desde un orden infactible la
+busqueda vuelve primero a ordenes factibles. Cada iteracion evalua candidate_size intercambios
+al azar. Tras diversify_after iteraciones sin mejorar, los movimientos se penalizan por su frecuencia durante phase_length iteraciones
+(diversificacion); tras restart_after iteraciones sin mejorar se reinicia desde una de las
+soluciones elite (intensificacion). Con preprocessing (uav_preprocess) los intercambios que rompen
+una precedencia forzada se descartan sin evaluarlos.
+"""
+
+def solve_tabu_search(instance, order, seed=None, iterations=1000, tabu_list_size=10, candidate_size=50,
+                      elite_size=5, diversify_after=50, phase_length=25, restart_after=150, frequency_weight=1.0,
+                      target_cost=None, preprocessing=None):
+    rng = np.random.default_rng(seed)
+    n = len(order)
+    schedule = Schedule(instance, order)
+    current_order = schedule.order
+    current_cost = schedule.evaluation()
+
+    best_order, best_cost = current_order[:], current_cost
+    elite = [(current_cost, tuple(current_order))]
+
+    frequency = np.zeros((n, n), dtype=np.int64)
+    recency = np.full((n, n), -tabu_list_size - 1, dtype=np.int64)
+    arrival = np.zeros(n, dtype=np.int64)
+    # Escala de la penalizacion de frecuencia: el costo medio por UAV de la solucion inicial
+    scale = frequency_weight * max(current_cost[1], 1) / n
+
+    last_improvement = 0
+    diversify_until = -1
+    for iteration in range(1, iterations + 1):
+        if target_cost is not None and best_cost[0] == 0 and best_cost[1] <= target_cost:
+            break
+
+        diversifying = iteration <= diversify_until
+
+        best_move = None
+        best_score = (float('inf'), float('inf'))
+        for _ in range(candidate_size):
+            i, j = rng.choice(n, 2, replace=False)
+            if i > j:
+                i, j = j, i
+            if preprocessing is not None and not preprocessing.allows_swap(current_order, i, j):
+                continue
+            u, v = current_order[j], current_order[i]
+            cost = schedule.swap_evaluation(i, j)
+
+            tabu = recency[u, i] >= iteration - tabu_list_size or recency[v, j] >= iteration - tabu_list_size
+            if tabu and cost >= best_cost:
+                continue
+
+            score = cost
+            if diversifying:
+                score = (cost[0], cost[1] + scale * (frequency[u, i] + frequency[v, j]) / iteration)
+            if score < best_score:
+                best_move, best_score = (i, j, cost), score
+
+        if best_move is None:
+            continue
+
+        # Aplicar el intercambio y actualizar la memoria solo de los dos UAVs que se mueven
+        i, j, cost = best_move
+        u, v = current_order[j], current_order[i]
+        frequency[v, i] += iteration - arrival[v]
+        frequency[u, j] += iteration - arrival[u]
+        recency[v, i] = recency[u, j] = iteration
+        arrival[u] = arrival[v] = iteration
+        schedule.swap(i, j)
+        current_cost = cost
+
+        if current_cost < best_cost:
+            best_order, best_cost = current_order[:], current_cost
+            last_improvement = iteration
+            elite.append((current_cost, tuple(current_order)))
+            elite = sorted(set(elite))[:elite_size]
+        elif iteration - last_improvement >= restart_after:
+            # Intensificacion: volver a una solucion elite
+            frequency[current_order, np.arange(n)] += iteration - arrival[current_order]
+            current_cost, restart = elite[rng.integers(len(elite))]
+            schedule = Schedule(instance, restart)
+            current_order = schedule.order
+            arrival[current_order] = iteration
+            last_improvement = iteration
+        elif iteration - last_improvement == diversify_after:
+            diversify_until = iteration + phase_length
+
+    return best_order, best_cost[1]
+
+
+"""
+Registro de algoritmos con una firma comun (instance, seed, budget, target_cost) -> (orden, costo).
+budget es el maximo de iteraciones de la busqueda local; None usa el valor por defecto.
+Las busquedas locales se detienen antes si encuentran un orden factible de costo <= target_cost.
+"""
+
+def run_greedy(instance, seed=0, budget=None, target_cost=None):
+    order = solve_greedy(instance)
+    return order, calculate_cost(instance, order)
+
+
+def run_greedy_stochastic(instance, seed=0, budget=None, target_cost=None):
+    order = solve_greedy_stochastic(instance, seed)
+    return order, calculate_cost(instance, order)
+
+
+def run_hill_climbing_any(instance, seed=0, budget=None, target_cost=None):
+    return solve_hill_climbing(instance, solve_greedy_stochastic(instance, seed), seed, neighborhood='reversal',
+                               max_iterations=budget or 1000, target_cost=target_cost, preprocessing=preprocess(instance))
+
+
+def run_hill_climbing_best(instance, seed=0, budget=None, target_cost=None):
+    return solve_hill_climbing(instance, solve_greedy_stochastic(instance, seed), seed, neighborhood='swap',
+                               best_improvement=True, max_iterations=budget or 1000, target_cost=target_cost,
+                               preprocessing=preprocess(instance))
+
+
+def run_hill_climbing_full(instance, seed=0, budget=None, target_cost=None):
+    return solve_steepest_descent(instance, solve_greedy_stochastic(instance, seed), 'reversal',
+                                  max_iterations=budget or 1000, target_cost=target_cost, preprocessing=preprocess(instance))
+
+
+def run_tabu_search(instance, seed=0, budget=None, target_cost=None):
+    return solve_tabu_search(instance, solve_greedy_stochastic(instance, seed), seed,
+                             iterations=budget or 1000, target_cost=target_cost, preprocessing=preprocess(instance))
+
+
+def run_branch_and_bound(instance, seed=0, budget=None, target_cost=None):
+    # budget es el maximo de nodos; uav_exact importa este modulo, por eso el import va aqui
+    from uav_exact import solve_branch_and_bound
+    result = solve_branch_and_bound(instance, node_limit=budget)
+    return result.order, result.cost
+
+
+def run_alns(instance, seed=0, budget=None, target_cost=None):
+    # budget es el maximo de iteraciones de destruccion y reparacion; uav_alns importa este modulo
+    from uav_alns import solve_alns
+    return solve_alns(instance, solve_greedy(instance), seed, iterations=budget or 1000, target_cost=target_cost,
+                      preprocessing=preprocess(instance))
+
+
+ALGORITHMS = {
+    'greedy': run_greedy,
+    'greedy-stochastic': run_greedy_stochastic,
+    'hill-climbing-any': run_hill_climbing_any,
+    'hill-climbing-best': run_hill_climbing_best,
+    'hill-climbing-full': run_hill_climbing_full,
+    'tabu': run_tabu_search,
+    'alns': run_alns,
+    'branch-and-bound': run_branch_and_bound,
+}
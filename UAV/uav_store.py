@@ -0,0 +1,225 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from uav_bounds import lower_bound, optimality_gap
+from uav_model import evaluate, read_instance
+from uav_solvers import ALGORITHMS
+
+
+"""
+Resultados de las corridas guardados en SQLite, para no recalcular barridos de semillas.
+
+Una corrida se identifica por (hash del contenido de la instancia, algoritmo, parametros,
+semilla); los parametros se guardan como JSON con las llaves ordenadas, asi que {"budget": 1000}
+es siempre el mismo texto. sweep consulta primero que semillas ya estan y solo corre las que
+faltan, guardando cada resultado apenas termina: un barrido interrumpido se retoma donde quedo.
+
+Indices: la llave unica (instancia, algoritmo, parametros, semilla) sirve para buscar las
+semillas ya corridas y para las distribuciones por rango de semillas; (instancia, costo) para la
+mejor corrida por instancia.
+"""
+
+DEFAULT_STORE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS instances (
+    hash TEXT PRIMARY KEY,
+    name TEXT,
+    n INTEGER NOT NULL,
+    lower_bound REAL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    instance_hash TEXT NOT NULL REFERENCES instances(hash),
+    algorithm TEXT NOT NULL,
+    params TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    lateness REAL NOT NULL,
+    feasible INTEGER NOT NULL,
+    landing_order TEXT NOT NULL,
+    elapsed REAL NOT NULL,
+    created REAL NOT NULL,
+    UNIQUE (instance_hash, algorithm, params, seed)
+);
+CREATE INDEX IF NOT EXISTS runs_by_cost ON runs (instance_hash, feasible, cost);
+"""
+
+
+def canonical_params(params):
+    return json.dumps(params or {}, sort_keys=True, separators=(',', ':'))
+
+
+class ResultStore:
+    def __init__(self, path=DEFAULT_STORE):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_instance(self, instance, name=None):
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO instances (hash, name, n) VALUES (?, ?, ?) "
+                "ON CONFLICT (hash) DO UPDATE SET name = COALESCE(excluded.name, name)",
+                (instance.content_hash, name, instance.n))
+
+    def set_lower_bound(self, instance_hash, bound):
+        with self.connection:
+            self.connection.execute("UPDATE instances SET lower_bound = ? WHERE hash = ?", (bound, instance_hash))
+
+    def lower_bound(self, instance_hash):
+        row = self.connection.execute("SELECT lower_bound FROM instances WHERE hash = ?", (instance_hash,)).fetchone()
+        return row['lower_bound'] if row is not None else None
+
+    def stored_seeds(self, instance_hash, algorithm, params, seeds=None):
+        # Con seeds consecutivas basta un rango en la llave unica
+        query = "SELECT seed FROM runs WHERE instance_hash = ? AND algorithm = ? AND params = ?"
+        arguments = [instance_hash, algorithm, canonical_params(params)]
+        if seeds is not None:
+            seeds = list(seeds)
+            if not seeds:
+                return set()
+            query += " AND seed BETWEEN ? AND ?"
+            arguments += [min(seeds), max(seeds)]
+        return {row['seed'] for row in self.connection.execute(query, arguments)}
+
+    def add_run(self, instance_hash, algorithm, params, seed, order, cost, lateness, elapsed):
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO runs (instance_hash, algorithm, params, seed, cost, lateness, feasible, "
+                "landing_order, elapsed, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (instance_hash, algorithm, canonical_params(params), seed, cost, lateness, int(lateness == 0),
+                 json.dumps([int(i) for i in order]), elapsed, time.time()))
+
+    def get_run(self, instance_hash, algorithm, params, seed):
+        return self.connection.execute(
+            "SELECT * FROM runs WHERE instance_hash = ? AND algorithm = ? AND params = ? AND seed = ?",
+            (instance_hash, algorithm, canonical_params(params), seed)).fetchone()
+
+    def best(self, instance_hash=None, algorithm=None):
+        """
+        Mejor corrida factible por instancia (o solo de instance_hash), opcionalmente de un algoritmo.
+        Devuelve filas con name, instance_hash, algorithm, params, seed, cost y lower_bound.
+        """
+        conditions = ["runs.feasible = 1"]
+        arguments = []
+        if instance_hash is not None:
+            conditions.append("runs.instance_hash = ?")
+            arguments.append(instance_hash)
+        if algorithm is not None:
+            conditions.append("runs.algorithm = ?")
+            arguments.append(algorithm)
+        where = " AND ".join(conditions)
+        # La ventana recorre runs_by_cost por instancia en orden de costo; empates por la menor semilla
+        return self.connection.execute(
+            "SELECT instances.name, instances.lower_bound, ranked.* FROM ("
+            "  SELECT runs.*, ROW_NUMBER() OVER (PARTITION BY runs.instance_hash ORDER BY runs.cost, runs.seed) AS rank"
+            f"  FROM runs WHERE {where}"
+            ") AS ranked JOIN instances ON instances.hash = ranked.instance_hash WHERE ranked.rank = 1 "
+            "ORDER BY instances.name", arguments).fetchall()
+
+    def distribution(self, instance_hash, algorithm, params, first_seed=None, last_seed=None):
+        # Resumen de costos de las corridas con semilla en [first_seed, last_seed]
+        where = "instance_hash = ? AND algorithm = ? AND params = ?"
+        arguments = [instance_hash, algorithm, canonical_params(params)]
+        if first_seed is not None:
+            where += " AND seed >= ?"
+            arguments.append(first_seed)
+        if last_seed is not None:
+            where += " AND seed <= ?"
+            arguments.append(last_seed)
+        summary = dict(self.connection.execute(
+            "SELECT COUNT(*) AS runs, SUM(feasible) AS feasible, MIN(cost) AS min, AVG(cost) AS mean, MAX(cost) AS max "
+            f"FROM runs WHERE {where}", arguments).fetchone())
+        costs = [row['cost'] for row in self.connection.execute(f"SELECT cost FROM runs WHERE {where} ORDER BY cost", arguments)]
+        summary['median'] = (costs[(len(costs) - 1) // 2] + costs[len(costs) // 2]) / 2 if costs else None
+        return summary
+
+
+def _run(instance, algorithm, seed, budget):
+    start_time = time.perf_counter()
+    order, cost = ALGORITHMS[algorithm](instance, seed, budget)
+    lateness, _ = evaluate(instance, order)
+    return seed, order, cost, lateness, time.perf_counter() - start_time
+
+
+def sweep(store, instance, algorithm, seeds, budget=None, name=None, workers=1):
+    """
+    Corre algorithm sobre instance con las semillas que todavia no estan en store y guarda cada
+    resultado al terminar. Devuelve (corridas nuevas, corridas que ya estaban).
+    """
+    params = {'budget': budget}
+    seeds = list(seeds)
+    store.add_instance(instance, name)
+    if store.lower_bound(instance.content_hash) is None:
+        store.set_lower_bound(instance.content_hash, lower_bound(instance))
+    stored = store.stored_seeds(instance.content_hash, algorithm, params, seeds)
+    pending = [seed for seed in seeds if seed not in stored]
+
+    if workers == 1:
+        results = (_run(instance, algorithm, seed, budget) for seed in pending)
+        for seed, order, cost, lateness, elapsed in results:
+            store.add_run(instance.content_hash, algorithm, params, seed, order, cost, lateness, elapsed)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run, instance, algorithm, seed, budget) for seed in pending]
+            for future in as_completed(futures):
+                seed, order, cost, lateness, elapsed = future.result()
+                store.add_run(instance.content_hash, algorithm, params, seed, order, cost, lateness, elapsed)
+    return len(pending), len(seeds) - len(pending)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Barridos de semillas con resultados guardados en SQLite.")
+    parser.add_argument("--store", type=str, default=DEFAULT_STORE, help="Archivo SQLite de resultados")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sweep_parser = subparsers.add_parser("sweep", help="Correr las semillas que todavia no estan guardadas")
+    sweep_parser.add_argument("file_paths", type=str, nargs="+", help="Archivos de instancias")
+    sweep_parser.add_argument("--algorithm", type=str, default="greedy-stochastic", choices=sorted(ALGORITHMS), help="Algoritmo a correr")
+    sweep_parser.add_argument("--seeds", type=int, nargs=2, default=[0, 100], metavar=("DESDE", "HASTA"), help="Rango de semillas [desde, hasta)")
+    sweep_parser.add_argument("--budget", type=int, default=None, help="Iteraciones (o nodos en branch-and-bound) por corrida")
+    sweep_parser.add_argument("--workers", type=int, default=1, help="Procesos en paralelo")
+
+    best_parser = subparsers.add_parser("best", help="Mejor corrida factible por instancia")
+    best_parser.add_argument("--algorithm", type=str, default=None, help="Solo corridas de este algoritmo")
+
+    distribution_parser = subparsers.add_parser("distribution", help="Resumen de costos en un rango de semillas")
+    distribution_parser.add_argument("file_path", type=str, help="Archivo de la instancia")
+    distribution_parser.add_argument("--algorithm", type=str, default="greedy-stochastic", help="Algoritmo")
+    distribution_parser.add_argument("--seeds", type=int, nargs=2, default=None, metavar=("DESDE", "HASTA"), help="Rango de semillas [desde, hasta)")
+    distribution_parser.add_argument("--budget", type=int, default=None, help="Budget con que se corrieron")
+    args = parser.parse_args()
+
+    with ResultStore(args.store) as store:
+        if args.command == "sweep":
+            for file_path in args.file_paths:
+                instance = read_instance(file_path)
+                start_time = time.perf_counter()
+                computed, skipped = sweep(store, instance, args.algorithm, range(*args.seeds), args.budget,
+                                          os.path.basename(file_path), args.workers)
+                print(f"{os.path.basename(file_path)}: {computed} corridas nuevas, {skipped} ya guardadas "
+                      f"en {time.perf_counter() - start_time:.4f} segundos")
+        elif args.command == "best":
+            for row in store.best(algorithm=args.algorithm):
+                gap = f", Gap: {optimality_gap(row['cost'], row['lower_bound']):.2%}" if row['lower_bound'] is not None else ""
+                print(f"{row['name']}: costo {row['cost']} con {row['algorithm']} {row['params']} semilla {row['seed']}{gap}")
+        else:
+            instance = read_instance(args.file_path)
+            first_seed, last_seed = (args.seeds[0], args.seeds[1] - 1) if args.seeds else (None, None)
+            summary = store.distribution(instance.content_hash, args.algorithm, {'budget': args.budget}, first_seed, last_seed)
+            print(json.dumps(summary))
@@ -0,0 +1,321 @@
+import argparse
+import itertools
+import json
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from uav_model import evaluate, read_instance
+from uav_preprocess import preprocess
+from uav_solvers import solve_greedy_stochastic, solve_hill_climbing, solve_tabu_search
+
+
+"""
+Ajuste de parametros de los solvers con carreras al estilo F-Race.
+
+Para cada clase de instancias (por tamaño) se sortean configuraciones del espacio del algoritmo,
+siempre con la configuracion por defecto entre ellas. Un bloque es un par (instancia, semilla) y
+en cada paso de la carrera todas las configuraciones vivas corren sobre el bloque siguiente, en
+paralelo. Desde first_test bloques, las configuraciones se ordenan por (atraso, costo) dentro de
+cada bloque y se aplica el test de Friedman; si rechaza que todas sean iguales (p < alpha), se
+eliminan las que segun la comparacion post hoc de Conover tienen una suma de rangos peor que la
+mejor. Asi las configuraciones claramente peores dejan de gastar corridas temprano y el total de
+corridas queda en una fraccion de la grilla completa (todas las configuraciones en todos los
+bloques).
+
+Las distribuciones chi cuadrado y t de Student salen de las funciones gamma y beta incompletas
+regularizadas (fracciones continuas como en Numerical Recipes), sin depender de scipy.
+"""
+
+CONSTRUCTION_SPACE = {
+    'rcl_size': [1, 2, 3, 4, 5, 6, 8],
+    'decay': [0.0, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0],
+}
+SPACES = {
+    'greedy-stochastic': CONSTRUCTION_SPACE,
+    'hill-climbing': {
+        **CONSTRUCTION_SPACE,
+        'neighborhood': ['reversal', 'swap'],
+        'best_improvement': [False, True],
+        'max_no_improvement': [25, 50, 100, 200, 400],
+        'max_attempts': [1, 5, 10, 20, 50],
+    },
+    'tabu': {
+        **CONSTRUCTION_SPACE,
+        'tabu_list_size': [5, 7, 10, 15, 20, 30],
+        'candidate_size': [10, 25, 50, 100],
+    },
+}
+DEFAULTS = {
+    'greedy-stochastic': {'rcl_size': 3, 'decay': 0.5},
+    'hill-climbing': {'rcl_size': 3, 'decay': 0.5, 'neighborhood': 'reversal', 'best_improvement': False,
+                      'max_no_improvement': 100, 'max_attempts': 10},
+    'tabu': {'rcl_size': 3, 'decay': 0.5, 'tabu_list_size': 10, 'candidate_size': 50},
+}
+SIZE_CLASSES = (20, 50)
+
+
+""" Distribuciones """
+
+def _gamma_q(a, x):
+    # Gamma incompleta regularizada superior Q(a, x)
+    if x <= 0:
+        return 1.0
+    log_front = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1 / a
+        denominator = a
+        for _ in range(1000):
+            denominator += 1
+            term *= x / denominator
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return 1 - total * math.exp(log_front)
+    b = x + 1 - a
+    c = 1 / 1e-300
+    d = 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = 1e-300 if abs(d) < 1e-300 else d
+        c = b + an / c
+        c = 1e-300 if abs(c) < 1e-300 else c
+        d = 1 / d
+        h *= d * c
+        if abs(d * c - 1) < 1e-15:
+            break
+    return math.exp(log_front) * h
+
+
+def chi2_sf(x, df):
+    return _gamma_q(df / 2, x / 2)
+
+
+def _beta_fraction(a, b, x):
+    c, d = 1.0, 1 - (a + b) * x / (a + 1)
+    d = 1 / (1e-300 if abs(d) < 1e-300 else d)
+    h = d
+    for m in range(1, 1000):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1 + numerator * d
+            d = 1 / (1e-300 if abs(d) < 1e-300 else d)
+            c = 1 + numerator / c
+            c = 1e-300 if abs(c) < 1e-300 else c
+            h *= d * c
+        if abs(d * c - 1) < 1e-15:
+            break
+    return h
+
+
+def beta_regularized(a, b, x):
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1 - x))
+    if x < (a + 1) / (a + b + 2):
+        return front * _beta_fraction(a, b, x) / a
+    return 1 - front * _beta_fraction(b, a, 1 - x) / b
+
+
+def t_cdf(t, df):
+    tail = 0.5 * beta_regularized(df / 2, 0.5, df / (df + t * t))
+    return 1 - tail if t > 0 else tail
+
+
+def t_quantile(q, df):
+    low, high = -1e3, 1e3
+    for _ in range(200):
+        middle = (low + high) / 2
+        if t_cdf(middle, df) < q:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+""" Test de Friedman """
+
+def block_ranks(results):
+    # results[b][k] = (atraso, costo); rangos 1..k por bloque, con empates promediados
+    ranks = np.empty((len(results), len(results[0])))
+    for b, row in enumerate(results):
+        ordered = sorted(range(len(row)), key=lambda k: row[k])
+        start = 0
+        while start < len(ordered):
+            end = start
+            while end + 1 < len(ordered) and row[ordered[end + 1]] == row[ordered[start]]:
+                end += 1
+            for position in range(start, end + 1):
+                ranks[b, ordered[position]] = (start + end) / 2 + 1
+            start = end + 1
+    return ranks
+
+
+def friedman_race_step(ranks, alpha=0.05):
+    """
+    Test de Friedman sobre una matriz de rangos (bloques, configuraciones). Devuelve el p-valor y
+    una mascara de las configuraciones que siguen en carrera: si el test rechaza, se quedan solo
+    las que no son significativamente peores que la de menor suma de rangos (post hoc de Conover).
+    """
+    b, k = ranks.shape
+    sums = ranks.sum(axis=0)
+    a = (ranks ** 2).sum()
+    c = b * k * (k + 1) ** 2 / 4
+    if k < 2 or b < 2 or a - c <= 0:
+        return 1.0, np.ones(k, dtype=bool)
+    statistic = (k - 1) * ((sums - b * (k + 1) / 2) ** 2).sum() / (a - c)
+    p_value = chi2_sf(statistic, k - 1)
+    if p_value >= alpha:
+        return p_value, np.ones(k, dtype=bool)
+
+    df = (b - 1) * (k - 1)
+    spread = math.sqrt(max(2 * (b * a - (sums ** 2).sum()) / df, 0))
+    limit = t_quantile(1 - alpha / 2, df) * spread
+    return p_value, sums - sums.min() <= limit
+
+
+""" Carrera """
+
+def _run_configuration(algorithm, config, instance, seed, budget, preprocessing):
+    construction = solve_greedy_stochastic(instance, seed, config['rcl_size'], config['decay'])
+    if algorithm == 'greedy-stochastic':
+        order = construction
+    elif algorithm == 'hill-climbing':
+        order, _ = solve_hill_climbing(instance, construction, seed, config['neighborhood'], config['best_improvement'],
+                                       max_iterations=budget, max_no_improvement=config['max_no_improvement'],
+                                       max_attempts=config['max_attempts'], preprocessing=preprocessing)
+    else:
+        order, _ = solve_tabu_search(instance, construction, seed, iterations=budget,
+                                     tabu_list_size=config['tabu_list_size'], candidate_size=config['candidate_size'],
+                                     preprocessing=preprocessing)
+    return evaluate(instance, order)
+
+
+def sample_configurations(algorithm, count, rng):
+    space = SPACES[algorithm]
+    names = sorted(space)
+    grid_size = math.prod(len(space[name]) for name in names)
+    configurations = [DEFAULTS[algorithm]]
+    seen = {tuple(DEFAULTS[algorithm][name] for name in names)}
+    if count >= grid_size:
+        configurations += [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))
+                           if values not in seen]
+        return configurations, grid_size
+    while len(configurations) < count:
+        values = tuple(space[name][rng.integers(len(space[name]))] for name in names)
+        if values not in seen:
+            seen.add(values)
+            configurations.append(dict(zip(names, values)))
+    return configurations, grid_size
+
+
+def instance_class(instance, bounds=SIZE_CLASSES):
+    for bound in bounds:
+        if instance.n <= bound:
+            return f"n<={bound}"
+    return f"n>{bounds[-1]}"
+
+
+def race(pool, algorithm, instances, configurations, seeds, budget, rng, alpha=0.05, first_test=5, max_experiments=None):
+    """
+    Corre la carrera de configurations sobre los bloques (instancia, semilla) en orden aleatorio.
+    Devuelve (indice de la mejor configuracion, rango medio por configuracion viva, corridas hechas,
+    bloques usados). Si max_experiments no alcanza para un bloque no se corre nada y se devuelve
+    la configuracion por defecto (la primera) sin rangos.
+    """
+    blocks = [(instance, seed) for instance in instances for seed in seeds]
+    blocks = [blocks[i] for i in rng.permutation(len(blocks))]
+    preprocessing = {instance.content_hash: preprocess(instance) for instance in instances}
+
+    alive = list(range(len(configurations)))
+    results = []
+    experiments = 0
+    for instance, seed in blocks:
+        if max_experiments is not None and experiments + len(alive) > max_experiments:
+            break
+        futures = [pool.submit(_run_configuration, algorithm, configurations[k], instance, seed, budget,
+                               preprocessing[instance.content_hash]) for k in alive]
+        results.append({k: future.result() for k, future in zip(alive, futures)})
+        experiments += len(alive)
+        if len(results) >= first_test and len(alive) > 1:
+            ranks = block_ranks([[row[k] for k in alive] for row in results])
+            _, keep = friedman_race_step(ranks, alpha)
+            alive = [k for k, kept in zip(alive, keep) if kept]
+        if len(alive) == 1:
+            break
+
+    if not results:
+        return 0, {}, 0, 0
+    ranks = block_ranks([[row[k] for k in alive] for row in results])
+    mean_ranks = dict(zip(alive, ranks.mean(axis=0)))
+    return min(alive, key=lambda k: mean_ranks[k]), mean_ranks, experiments, len(results)
+
+
+def tune(algorithm, file_paths, configurations=30, seeds=20, budget=200, workers=None, seed=0, alpha=0.05,
+         first_test=5, max_fraction=None):
+    rng = np.random.default_rng(seed)
+    classes = {}
+    for file_path in file_paths:
+        instance = read_instance(file_path)
+        classes.setdefault(instance_class(instance), []).append(instance)
+
+    report = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for name, instances in sorted(classes.items()):
+            candidates, grid_size = sample_configurations(algorithm, configurations, rng)
+            full_grid = grid_size * len(instances) * seeds
+            max_experiments = int(max_fraction * full_grid) if max_fraction is not None else None
+            start_time = time.perf_counter()
+            best, mean_ranks, experiments, blocks = race(pool, algorithm, instances, candidates, range(seeds), budget,
+                                                         rng, alpha, first_test, max_experiments)
+            report[name] = {
+                'best': candidates[best],
+                'default_is_best': best == 0,
+                'survivors': [candidates[k] for k in sorted(mean_ranks, key=mean_ranks.get)],
+                'mean_rank': float(mean_ranks[best]) if mean_ranks else None,
+                'experiments': experiments,
+                'blocks': blocks,
+                'full_grid': full_grid,
+                'sampled_grid': len(candidates) * len(instances) * seeds,
+                'elapsed': time.perf_counter() - start_time,
+            }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ajustar parametros de un solver de UAVs con carreras (F-Race).")
+    parser.add_argument("file_paths", type=str, nargs="+", help="Archivos de instancias")
+    parser.add_argument("--algorithm", type=str, default="hill-climbing", choices=sorted(SPACES), help="Algoritmo a ajustar")
+    parser.add_argument("--configurations", type=int, default=30, help="Configuraciones sorteadas por clase (incluye la por defecto)")
+    parser.add_argument("--seeds", type=int, default=20, help="Semillas por instancia")
+    parser.add_argument("--budget", type=int, default=200, help="Iteraciones de la busqueda local por corrida")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos en paralelo")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla del sorteo de configuraciones y bloques")
+    parser.add_argument("--alpha", type=float, default=0.05, help="Nivel del test de Friedman")
+    parser.add_argument("--first-test", type=int, default=5, help="Bloques antes del primer test")
+    parser.add_argument("--max-fraction", type=float, default=None, help="Maximo de corridas como fraccion de la grilla completa")
+    parser.add_argument("--output", type=str, default=None, help="Guardar el reporte en este JSON")
+    args = parser.parse_args()
+
+    report = tune(args.algorithm, args.file_paths, args.configurations, args.seeds, args.budget, args.workers,
+                  args.seed, args.alpha, args.first_test, args.max_fraction)
+    for name, result in report.items():
+        print(f"{name}: {json.dumps(result['best'], sort_keys=True)}"
+              f"{' (la por defecto)' if result['default_is_best'] else ''}")
+        if result['blocks'] == 0:
+            print("    --max-fraction no alcanza para correr un bloque: queda la configuracion por defecto")
+            continue
+        print(f"    rango medio {result['mean_rank']:.2f} entre {len(result['survivors'])} sobrevivientes, "
+              f"{result['experiments']} corridas en {result['blocks']} bloques "
+              f"({result['experiments'] / result['sampled_grid']:.2%} de correr todas las sorteadas en todos los bloques, "
+              f"{result['experiments'] / result['full_grid']:.2%} de la grilla completa), {result['elapsed']:.1f} segundos")
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2, sort_keys=True)